@@ -0,0 +1,82 @@
+"""Maintenance commands (``python -m app.cli <commande>``)."""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+from app.db.database import Database, bootstrap
+from app.services.incremental_backups import IncrementalBackupService
+from app.services.reports import ReportService
+
+
+def _aggregates(db: Database, args: argparse.Namespace) -> int:
+    reports = ReportService(db)
+    if args.rebuild:
+        reports.rebuild_monthly_totals()
+        print("Agrégats mensuels reconstruits.")
+        return 0
+    stale = reports.verify_monthly_totals()
+    if not stale:
+        print("Agrégats mensuels cohérents.")
+        return 0
+    print(f"{len(stale)} agrégat(s) incohérent(s):")
+    for month, category_id in stale:
+        print(f"  {month} catégorie {category_id}")
+    print("Relancez avec --rebuild pour les recalculer.")
+    return 1
+
+
+def _snapshots(db: Database, args: argparse.Namespace) -> int:
+    store = IncrementalBackupService(db)
+    if args.create:
+        snapshot = store.create_snapshot()
+        stats = store.last_stats
+        print(f"Snapshot {snapshot.name}: {stats.chunks_written}/{stats.chunks_total} blocs nouveaux")
+    if args.prune:
+        removed = store.prune(keep_last=args.keep_last, keep_days=args.keep_days)
+        print(f"{len(removed)} snapshot(s) supprimé(s)")
+    if args.verify:
+        problems = store.verify()
+        for problem in problems:
+            print(f"  {problem}")
+        print("Sauvegardes intègres." if not problems else f"{len(problems)} problème(s) détecté(s).")
+        if problems:
+            return 1
+    if args.restore:
+        store.restore_snapshot(args.restore)
+        print(f"Snapshot {args.restore} restauré.")
+    if not (args.create or args.prune or args.verify or args.restore):
+        for snapshot in store.list_snapshots():
+            print(f"{snapshot.name}  {snapshot.size:>12} octets  {len(snapshot.chunks)} blocs")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    parser.add_argument("--db", type=Path, default=None, help="base à utiliser (défaut: donnees.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    aggregates = commands.add_parser("agregats", help="vérifier ou reconstruire les agrégats mensuels")
+    aggregates.add_argument("--rebuild", action="store_true")
+    aggregates.set_defaults(handler=_aggregates)
+    snapshots = commands.add_parser("snapshots", help="sauvegardes incrémentales (liste par défaut)")
+    snapshots.add_argument("--create", action="store_true", help="créer un snapshot")
+    snapshots.add_argument("--prune", action="store_true", help="appliquer la rétention")
+    snapshots.add_argument("--keep-last", type=int, default=7)
+    snapshots.add_argument("--keep-days", type=int, default=30)
+    snapshots.add_argument("--verify", action="store_true", help="vérifier blocs et empreintes")
+    snapshots.add_argument("--restore", metavar="NOM", help="restaurer un snapshot")
+    snapshots.set_defaults(handler=_snapshots)
+
+    args = parser.parse_args(argv)
+    db = Database(args.db)
+    try:
+        bootstrap(db)
+        return args.handler(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
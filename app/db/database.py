@@ -1,40 +1,171 @@
 """Database connection helpers."""
 from __future__ import annotations
 
+import logging
 import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
+from app.db.migrations import SCHEMA_VERSION, get_schema_version, run_migrations, seed_categories
 from app.utils.paths import DATABASE_FILE, ensure_directories
 
-SCHEMA_VERSION = 1
+LOGGER = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class PerformanceProfile:
+    """SQLite pragmas applied to each connection."""
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kib: int = 65536
+    mmap_size: int = 268_435_456
+    temp_store: str = "MEMORY"
+    cached_statements: int = 512
+
+
+PERFORMANCE_PROFILES: Dict[str, PerformanceProfile] = {
+    "performance": PerformanceProfile(),
+    "sécurité": PerformanceProfile(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        cache_size_kib=2000,
+        mmap_size=0,
+        temp_store="DEFAULT",
+        cached_statements=128,
+    ),
+}
+DEFAULT_PROFILE = "performance"
 
 
 class Database:
     """Simple database wrapper."""
 
-    def __init__(self, db_path: Path | None = None) -> None:
+    def __init__(self, db_path: Path | None = None, profile: PerformanceProfile | None = None) -> None:
         ensure_directories()
         self.db_path = db_path or DATABASE_FILE
-        self.connection = sqlite3.connect(self.db_path)
+        self.profile = profile or PERFORMANCE_PROFILES[DEFAULT_PROFILE]
+        self.connection = sqlite3.connect(self.db_path, cached_statements=self.profile.cached_statements)
         self.connection.row_factory = sqlite3.Row
+        self._batch_depth = 0
+        self._write_version = 0
+        self.apply_profile(self.profile)
 
     def close(self) -> None:
         self.connection.close()
 
+    def apply_profile(self, profile: PerformanceProfile) -> None:
+        """Apply connection pragmas; ``cached_statements`` only applies on reconnect."""
+        self.profile = profile
+        conn = self.connection
+        journal = conn.execute(f"PRAGMA journal_mode={profile.journal_mode}").fetchone()[0]
+        conn.execute(f"PRAGMA synchronous={profile.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(profile.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(profile.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store={profile.temp_store}")
+        LOGGER.info("Profil SQLite appliqué (journal=%s, synchronous=%s)", journal, profile.synchronous)
+
+    def checkpoint(self) -> None:
+        """Flush the WAL into the main database file."""
+        if self.profile.journal_mode.upper() == "WAL":
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def optimize(self) -> None:
+        self.connection.execute("PRAGMA optimize")
+
+    def backup_to(
+        self,
+        target: Path,
+        pages_per_step: int = 256,
+        pause: float = 0.002,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> None:
+        """Copy a consistent snapshot of the database to ``target`` while it stays in use.
+
+        Uses SQLite's online backup API ``pages_per_step`` pages at a time and
+        sleeps ``pause`` seconds between steps so other connections can write.
+        ``progress(done, total)`` is called after each step; an exception it
+        raises aborts the copy.
+        """
+        if target.exists():
+            target.unlink()
+        destination = sqlite3.connect(target)
+        try:
+
+            def step(_status: int, remaining: int, total: int) -> None:
+                if progress is not None:
+                    progress(total - remaining, total)
+                if pause:
+                    time.sleep(pause)
+
+            self.connection.backup(destination, pages=pages_per_step, progress=step)
+            destination.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            destination.close()
+
+    @property
+    def data_version(self) -> Tuple[int, int]:
+        """Change marker: local writes bump the first part, other connections the second."""
+        return self._write_version, self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def bump_data_version(self) -> None:
+        """Record that this connection changed data that cached results depend on."""
+        self._write_version += 1
+
+    @property
+    def in_batch(self) -> bool:
+        return self._batch_depth > 0
+
+    @contextmanager
+    def batch(self) -> Iterator["Database"]:
+        """Group writes in one transaction; nested calls use savepoints.
+
+        ``execute``/``executemany`` skip their per-statement commit while a batch
+        is open. The outermost batch commits on success and rolls back on error;
+        a failing nested batch only rolls back to its own savepoint.
+        """
+        depth = self._batch_depth
+        savepoint = f"batch_{depth}"
+        if depth == 0:
+            self.connection.execute("BEGIN")
+        else:
+            self.connection.execute(f"SAVEPOINT {savepoint}")
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth = depth
+            if depth == 0:
+                self.connection.rollback()
+            else:
+                self.connection.execute(f"ROLLBACK TO {savepoint}")
+                self.connection.execute(f"RELEASE {savepoint}")
+            raise
+        self._batch_depth = depth
+        if depth == 0:
+            self.connection.commit()
+        else:
+            self.connection.execute(f"RELEASE {savepoint}")
+
+    def _commit(self) -> None:
+        if not self._batch_depth:
+            self.connection.commit()
+
     def execute(self, query: str, params: tuple | dict | None = None) -> sqlite3.Cursor:
         cur = self.connection.cursor()
         if params is None:
             cur.execute(query)
         else:
             cur.execute(query, params)
-        self.connection.commit()
+        self._commit()
         return cur
 
-    def executemany(self, query: str, params_seq: list[tuple]) -> sqlite3.Cursor:
+    def executemany(self, query: str, params_seq: Iterable[tuple]) -> sqlite3.Cursor:
         cur = self.connection.cursor()
         cur.executemany(query, params_seq)
-        self.connection.commit()
+        self._commit()
         return cur
 
     def query(self, query: str, params: tuple | dict | None = None) -> list[sqlite3.Row]:
@@ -46,105 +177,37 @@ class Database:
         return cur.fetchall()
 
 
-def bootstrap(db: Database) -> None:
-    """Ensure database schema exists and migrations are applied."""
-    create_schema(db)
+def check_integrity(path: Path) -> List[str]:
+    """Run ``PRAGMA integrity_check`` on a database file; an empty list means sound."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as exc:
+        return [str(exc)]
+    finally:
+        connection.close()
+    return [] if rows == ["ok"] else rows
 
 
-def create_schema(db: Database) -> None:
-    """Create initial schema if needed."""
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-        """
-    )
-    current_version = get_schema_version(db)
-    if current_version >= SCHEMA_VERSION:
-        return
-    db.execute("INSERT OR REPLACE INTO settings(key, value) VALUES('schema_version', ?) ", (str(SCHEMA_VERSION),))
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE,
-            type TEXT CHECK(type IN ('recette','dépense'))
-        )
-        """
-    )
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS counterparties (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            type TEXT NULL
-        )
-        """
-    )
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT,
-            label TEXT,
-            amount REAL,
-            category_id INTEGER,
-            counterparty_id INTEGER NULL,
-            payment_method TEXT,
-            note TEXT,
-            attachment TEXT NULL,
-            reconciled INTEGER DEFAULT 0,
-            external_ref TEXT NULL,
-            FOREIGN KEY(category_id) REFERENCES categories(id),
-            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
-        )
-        """
-    )
-    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date)")
-    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(category_id)")
-    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_counterparty ON transactions(counterparty_id)")
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS invoices (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            number TEXT UNIQUE,
-            date TEXT,
-            counterparty_id INTEGER,
-            total_ht REAL,
-            total_tva REAL,
-            total_ttc REAL,
-            status TEXT CHECK(status IN ('brouillon','émise','payée')),
-            pdf_path TEXT NULL,
-            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
-        )
-        """
-    )
-
-    seed_categories(db)
-
-
-def get_schema_version(db: Database) -> int:
-    row = db.query("SELECT value FROM settings WHERE key='schema_version'")
-    if not row:
-        return 0
-    return int(row[0][0])
-
-
-def seed_categories(db: Database) -> None:
-    existing = {row[0] for row in db.query("SELECT name FROM categories")}
-    defaults = [
-        ("Ventes", "recette"),
-        ("Achats", "dépense"),
-        ("Déplacements", "dépense"),
-        ("Logiciels", "dépense"),
-        ("Banque", "dépense"),
-        ("Divers", "dépense"),
-    ]
-    to_insert = [item for item in defaults if item[0] not in existing]
-    if to_insert:
-        db.executemany("INSERT INTO categories(name, type) VALUES(?, ?)", to_insert)
+def bootstrap(db: Database, progress: Callable[[int, int], None] | None = None) -> None:
+    """Ensure database schema exists and migrations are applied."""
+    run_migrations(db, progress)
 
 
-__all__ = ["Database", "bootstrap", "create_schema", "seed_categories", "SCHEMA_VERSION"]
+def create_schema(db: Database) -> None:
+    """Create the schema if needed and upgrade it to ``SCHEMA_VERSION``."""
+    run_migrations(db)
+
+
+__all__ = [
+    "Database",
+    "PerformanceProfile",
+    "PERFORMANCE_PROFILES",
+    "DEFAULT_PROFILE",
+    "bootstrap",
+    "check_integrity",
+    "create_schema",
+    "get_schema_version",
+    "seed_categories",
+    "SCHEMA_VERSION",
+]
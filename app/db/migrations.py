@@ -0,0 +1,441 @@
+"""Ordered schema migrations.
+
+Each :class:`Migration` runs in its own transaction and bumps
+``schema_version`` when it completes. Heavy steps (backfills, index builds on
+large tables) can be written as generators: the runner commits after every
+``yield`` so startup stays responsive and an interrupted run resumes where it
+stopped. Such steps must therefore be idempotent, e.g. by only touching rows
+that still need work (see :func:`backfill_in_batches`).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterator, List
+
+if TYPE_CHECKING:
+    from app.db.database import Database
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[["Database"], Iterator[int] | None]
+
+
+def run_migrations(db: Database, progress: Callable[[int, int], None] | None = None) -> List[int]:
+    """Apply pending migrations in order and return the versions applied.
+
+    ``progress`` receives ``(version, rows_done)`` after each committed batch of
+    a generator migration.
+    """
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """
+    )
+    current_version = get_schema_version(db)
+    applied: List[int] = []
+    for migration in MIGRATIONS:
+        if migration.version <= current_version:
+            continue
+        LOGGER.info("Migration %s: %s", migration.version, migration.description)
+        started = time.perf_counter()
+        with db.batch():
+            steps = migration.apply(db)
+            if steps is None:
+                _set_schema_version(db, migration.version)
+        while steps is not None:
+            with db.batch():
+                done = next(steps, None)
+                if done is None:
+                    _set_schema_version(db, migration.version)
+            if done is None:
+                break
+            if progress is not None:
+                progress(migration.version, done)
+        LOGGER.info("Migration %s appliquée en %.3f s", migration.version, time.perf_counter() - started)
+        applied.append(migration.version)
+    return applied
+
+
+def backfill_in_batches(
+    db: Database, table: str, assignments: str, where: str, batch_size: int = 5000
+) -> Iterator[int]:
+    """Run ``UPDATE table SET assignments WHERE where`` ``batch_size`` rows at a time.
+
+    ``where`` must stop matching a row once it has been updated, which makes
+    the backfill resumable. Yields the cumulative number of rows updated.
+    """
+    total = 0
+    while True:
+        cur = db.execute(
+            f"""
+            UPDATE {table} SET {assignments}
+            WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)
+            """,
+            (batch_size,),
+        )
+        if cur.rowcount <= 0:
+            return
+        total += cur.rowcount
+        yield total
+
+
+def has_column(db: Database, table: str, column: str) -> bool:
+    return any(row["name"] == column for row in db.query(f"PRAGMA table_info({table})"))
+
+
+def _v1_initial_schema(db: Database) -> None:
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            type TEXT CHECK(type IN ('recette','dépense'))
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS counterparties (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT NULL
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            label TEXT,
+            amount REAL,
+            category_id INTEGER,
+            counterparty_id INTEGER NULL,
+            payment_method TEXT,
+            note TEXT,
+            attachment TEXT NULL,
+            reconciled INTEGER DEFAULT 0,
+            external_ref TEXT NULL,
+            FOREIGN KEY(category_id) REFERENCES categories(id),
+            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
+        )
+        """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(category_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_counterparty ON transactions(counterparty_id)")
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            number TEXT UNIQUE,
+            date TEXT,
+            counterparty_id INTEGER,
+            total_ht REAL,
+            total_tva REAL,
+            total_ttc REAL,
+            status TEXT CHECK(status IN ('brouillon','émise','payée')),
+            pdf_path TEXT NULL,
+            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
+        )
+        """
+    )
+    seed_categories(db)
+
+
+def _v2_integer_cents(db: Database) -> None:
+    """Store money as integer cents (``*_cents INTEGER``) instead of ``REAL``."""
+    if has_column(db, "transactions", "amount_cents"):
+        return
+    db.execute(
+        """
+        CREATE TABLE transactions_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            label TEXT,
+            amount_cents INTEGER NOT NULL DEFAULT 0,
+            category_id INTEGER,
+            counterparty_id INTEGER NULL,
+            payment_method TEXT,
+            note TEXT,
+            attachment TEXT NULL,
+            reconciled INTEGER DEFAULT 0,
+            external_ref TEXT NULL,
+            FOREIGN KEY(category_id) REFERENCES categories(id),
+            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
+        )
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO transactions_v2(
+            id, date, label, amount_cents, category_id, counterparty_id, payment_method,
+            note, attachment, reconciled, external_ref
+        )
+        SELECT id, date, label, CAST(ROUND(COALESCE(amount, 0) * 100) AS INTEGER), category_id,
+               counterparty_id, payment_method, note, attachment, reconciled, external_ref
+        FROM transactions
+        """
+    )
+    db.execute("DROP TABLE transactions")
+    db.execute("ALTER TABLE transactions_v2 RENAME TO transactions")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(category_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tx_counterparty ON transactions(counterparty_id)")
+
+    db.execute(
+        """
+        CREATE TABLE invoices_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            number TEXT UNIQUE,
+            date TEXT,
+            counterparty_id INTEGER,
+            total_ht_cents INTEGER NOT NULL DEFAULT 0,
+            total_tva_cents INTEGER NOT NULL DEFAULT 0,
+            total_ttc_cents INTEGER NOT NULL DEFAULT 0,
+            status TEXT CHECK(status IN ('brouillon','émise','payée')),
+            pdf_path TEXT NULL,
+            FOREIGN KEY(counterparty_id) REFERENCES counterparties(id)
+        )
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO invoices_v2(
+            id, number, date, counterparty_id, total_ht_cents, total_tva_cents, total_ttc_cents,
+            status, pdf_path
+        )
+        SELECT id, number, date, counterparty_id,
+               CAST(ROUND(COALESCE(total_ht, 0) * 100) AS INTEGER),
+               CAST(ROUND(COALESCE(total_tva, 0) * 100) AS INTEGER),
+               CAST(ROUND(COALESCE(total_ttc, 0) * 100) AS INTEGER),
+               status, pdf_path
+        FROM invoices
+        """
+    )
+    db.execute("DROP TABLE invoices")
+    db.execute("ALTER TABLE invoices_v2 RENAME TO invoices")
+
+
+def _v3_fulltext_search(db: Database) -> Iterator[int]:
+    """FTS5 index over label, note and counterparty name, kept in sync by triggers."""
+    db.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            label, note, counterparty, tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_tx_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts(rowid, label, note, counterparty)
+            VALUES (
+                new.id, new.label, new.note,
+                (SELECT name FROM counterparties WHERE id = new.counterparty_id)
+            );
+        END
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_tx_fts_update
+        AFTER UPDATE OF label, note, counterparty_id ON transactions BEGIN
+            UPDATE transactions_fts SET
+                label = new.label,
+                note = new.note,
+                counterparty = (SELECT name FROM counterparties WHERE id = new.counterparty_id)
+            WHERE rowid = new.id;
+        END
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_tx_fts_delete AFTER DELETE ON transactions BEGIN
+            DELETE FROM transactions_fts WHERE rowid = old.id;
+        END
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cp_fts_rename AFTER UPDATE OF name ON counterparties BEGIN
+            UPDATE transactions_fts SET counterparty = new.name
+            WHERE rowid IN (SELECT id FROM transactions WHERE counterparty_id = new.id);
+        END
+        """
+    )
+    return _index_existing_transactions(db)
+
+
+def _index_existing_transactions(db: Database, batch_size: int = 5000) -> Iterator[int]:
+    total = 0
+    while True:
+        cur = db.execute(
+            """
+            INSERT INTO transactions_fts(rowid, label, note, counterparty)
+            SELECT t.id, t.label, t.note, cp.name
+            FROM transactions t
+            LEFT JOIN counterparties cp ON cp.id = t.counterparty_id
+            WHERE t.id > (SELECT COALESCE(MAX(rowid), 0) FROM transactions_fts)
+            ORDER BY t.id
+            LIMIT ?
+            """,
+            (batch_size,),
+        )
+        if cur.rowcount <= 0:
+            return
+        total += cur.rowcount
+        yield total
+
+
+MONTHLY_TOTALS_SELECT = """
+    SELECT substr(date, 1, 7) AS month, COALESCE(category_id, 0) AS category_id,
+           SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END) AS recettes_cents,
+           SUM(CASE WHEN amount_cents < 0 THEN amount_cents ELSE 0 END) AS depenses_cents,
+           COUNT(*) AS tx_count
+    FROM transactions
+"""
+
+
+def _v4_monthly_totals(db: Database) -> Iterator[int]:
+    """Per-month, per-category totals maintained by triggers on ``transactions``."""
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_totals (
+            month TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            recettes_cents INTEGER NOT NULL DEFAULT 0,
+            depenses_cents INTEGER NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, category_id)
+        ) WITHOUT ROWID
+        """
+    )
+    add_new = """
+        INSERT INTO monthly_totals(month, category_id, recettes_cents, depenses_cents, tx_count)
+        VALUES (
+            substr(new.date, 1, 7), COALESCE(new.category_id, 0),
+            MAX(new.amount_cents, 0), MIN(new.amount_cents, 0), 1
+        )
+        ON CONFLICT(month, category_id) DO UPDATE SET
+            recettes_cents = recettes_cents + excluded.recettes_cents,
+            depenses_cents = depenses_cents + excluded.depenses_cents,
+            tx_count = tx_count + 1;
+    """
+    remove_old = """
+        UPDATE monthly_totals SET
+            recettes_cents = recettes_cents - MAX(old.amount_cents, 0),
+            depenses_cents = depenses_cents - MIN(old.amount_cents, 0),
+            tx_count = tx_count - 1
+        WHERE month = substr(old.date, 1, 7) AND category_id = COALESCE(old.category_id, 0);
+        DELETE FROM monthly_totals
+        WHERE month = substr(old.date, 1, 7) AND category_id = COALESCE(old.category_id, 0)
+          AND tx_count <= 0;
+    """
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_totals_insert AFTER INSERT ON transactions
+        WHEN new.date IS NOT NULL BEGIN {add_new} END
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_totals_delete AFTER DELETE ON transactions
+        WHEN old.date IS NOT NULL BEGIN {remove_old} END
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_totals_update_old
+        AFTER UPDATE OF date, amount_cents, category_id ON transactions
+        WHEN old.date IS NOT NULL BEGIN {remove_old} END
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tx_totals_update_new
+        AFTER UPDATE OF date, amount_cents, category_id ON transactions
+        WHEN new.date IS NOT NULL BEGIN {add_new} END
+        """
+    )
+    return _fill_monthly_totals(db)
+
+
+def _fill_monthly_totals(db: Database) -> Iterator[int]:
+    years = [
+        row[0]
+        for row in db.query("SELECT DISTINCT substr(date, 1, 4) FROM transactions WHERE date IS NOT NULL")
+    ]
+    done = 0
+    for year in years:
+        db.execute(
+            f"""
+            INSERT OR REPLACE INTO monthly_totals(
+                month, category_id, recettes_cents, depenses_cents, tx_count
+            )
+            {MONTHLY_TOTALS_SELECT}
+            WHERE date >= ? AND date < ?
+            GROUP BY 1, 2
+            """,
+            (year, year + "\U0010ffff"),
+        )
+        done += 1
+        yield done
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "schéma initial", _v1_initial_schema),
+    Migration(2, "montants en centimes entiers", _v2_integer_cents),
+    Migration(3, "recherche plein texte", _v3_fulltext_search),
+    Migration(4, "agrégats mensuels", _v4_monthly_totals),
+]
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(db: Database) -> int:
+    row = db.query("SELECT value FROM settings WHERE key='schema_version'")
+    if not row:
+        return 0
+    return int(row[0][0])
+
+
+def _set_schema_version(db: Database, version: int) -> None:
+    db.execute("INSERT OR REPLACE INTO settings(key, value) VALUES('schema_version', ?)", (str(version),))
+
+
+def seed_categories(db: Database) -> None:
+    existing = {row[0] for row in db.query("SELECT name FROM categories")}
+    defaults = [
+        ("Ventes", "recette"),
+        ("Achats", "dépense"),
+        ("Déplacements", "dépense"),
+        ("Logiciels", "dépense"),
+        ("Banque", "dépense"),
+        ("Divers", "dépense"),
+    ]
+    to_insert = [item for item in defaults if item[0] not in existing]
+    if to_insert:
+        db.executemany("INSERT INTO categories(name, type) VALUES(?, ?)", to_insert)
+
+
+__all__ = [
+    "MONTHLY_TOTALS_SELECT",
+    "Migration",
+    "MIGRATIONS",
+    "SCHEMA_VERSION",
+    "backfill_in_batches",
+    "get_schema_version",
+    "has_column",
+    "run_migrations",
+    "seed_categories",
+]
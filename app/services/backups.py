@@ -3,16 +3,24 @@ from __future__ import annotations
 
 import json
 import shutil
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict
 
-from app.db.database import Database
+from app.db.database import Database, check_integrity
 from app.services.categories import CategoryService
 from app.services.settings import SettingsService
 from app.utils.paths import BACKUP_DIR, DATABASE_FILE, ensure_directories
 
 
+Progress = Callable[[int, int], None]
+
+
+class BackupIntegrityError(Exception):
+    """The database copy taken for a backup failed ``PRAGMA integrity_check``."""
+
+
 class BackupService:
     """Handle backup and restore operations."""
 
@@ -20,39 +28,70 @@ class BackupService:
         self.db = db
         ensure_directories()
 
-    def auto_backup(self) -> Path:
+    def auto_backup(self, progress: Progress | None = None) -> Path:
+        if self._incremental():
+            return self._snapshot(progress)
         timestamp = datetime.now().strftime("%Y%m%d-%H%M")
         target = BACKUP_DIR / f"backup-{timestamp}.zip"
-        self.create_backup(target)
+        self.create_backup(target, progress)
+        return target
+
+    def backup_now(self, progress: Progress | None = None) -> Path:
+        """Manual backup using the configured mode ("zip" or "incrémental")."""
+        if self._incremental():
+            return self._snapshot(progress)
+        target = BACKUP_DIR / "manuel.zip"
+        self.create_backup(target, progress)
         return target
 
-    def create_backup(self, path: Path) -> None:
+    def hot_copy(self, target: Path, progress: Progress | None = None) -> None:
+        """Copy the live database with the online backup API and verify the copy."""
+        self.db.backup_to(target, progress=progress)
+        problems = check_integrity(target)
+        if problems:
+            target.unlink()
+            raise BackupIntegrityError(f"Copie de la base invalide: {problems[0]}")
+
+    def _incremental(self) -> bool:
+        return SettingsService(self.db).get_setting("mode_backup") == "incrémental"
+
+    def _snapshot(self, progress: Progress | None = None) -> Path:
+        from app.services.incremental_backups import IncrementalBackupService
+
+        store = IncrementalBackupService(self.db)
+        snapshot = store.create_snapshot(progress)
+        store.prune()
+        return store.snapshots_dir / f"{snapshot.name}.json"
+
+    def create_backup(self, path: Path, progress: Progress | None = None) -> None:
         temp_dir = BACKUP_DIR / "temp"
         temp_dir.mkdir(exist_ok=True)
-        shutil.copy(DATABASE_FILE, temp_dir / DATABASE_FILE.name)
-        settings = SettingsService(self.db).export_settings()
-        categories = CategoryService(self.db).list_categories()
-        payload = {
-            "settings": settings,
-            "categories": [cat.__dict__ for cat in categories],
-        }
-        with (temp_dir / "metadata.json").open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2, ensure_ascii=False)
-        shutil.make_archive(path.with_suffix(""), "zip", temp_dir)
-        shutil.rmtree(temp_dir)
+        try:
+            self.hot_copy(temp_dir / DATABASE_FILE.name, progress)
+            settings = SettingsService(self.db).export_settings()
+            categories = CategoryService(self.db).list_categories()
+            payload = {
+                "settings": settings,
+                "categories": [asdict(cat) for cat in categories],
+            }
+            with (temp_dir / "metadata.json").open("w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2, ensure_ascii=False)
+            shutil.make_archive(path.with_suffix(""), "zip", temp_dir)
+        finally:
+            shutil.rmtree(temp_dir)
 
     def restore_backup(self, archive: Path) -> None:
         temp_dir = BACKUP_DIR / "restore"
         if temp_dir.exists():
             shutil.rmtree(temp_dir)
         shutil.unpack_archive(str(archive), temp_dir)
+        self.db.checkpoint()
         shutil.copy(temp_dir / DATABASE_FILE.name, DATABASE_FILE)
+        self.db.bump_data_version()
         with (temp_dir / "metadata.json").open("r", encoding="utf-8") as handle:
             data = json.load(handle)
-        settings = SettingsService(self.db)
-        for key, value in data.get("settings", {}).items():
-            settings.set_setting(key, str(value))
+        SettingsService(self.db).import_settings(data.get("settings", {}))
         shutil.rmtree(temp_dir)
 
 
-__all__ = ["BackupService"]
+__all__ = ["BackupIntegrityError", "BackupService"]
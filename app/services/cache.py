@@ -0,0 +1,79 @@
+"""Bounded result cache invalidated by the database data version."""
+from __future__ import annotations
+
+import copy
+import functools
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """LRU cache of query results tagged with the data version they were computed at.
+
+    An entry is only served while ``Database.data_version`` is unchanged, so
+    writes invalidate everything without tracking individual keys.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[Any, Any]] = OrderedDict()
+        self._stats = CacheStats()
+
+    def get_or_compute(self, key: Hashable, version: Any, compute: Callable[[], T]) -> T:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return copy.copy(entry[1])
+        self._stats.misses += 1
+        value = compute()
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+        return copy.copy(value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            size=len(self._entries),
+        )
+
+
+def cached(method: Callable[..., T]) -> Callable[..., T]:
+    """Cache a service method in ``self.cache`` keyed by name and arguments."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args: Any) -> T:
+        if self.cache is None:
+            return method(self, *args)
+        return self.cache.get_or_compute(
+            (method.__name__, *args), self.db.data_version, lambda: method(self, *args)
+        )
+
+    return wrapper
+
+
+__all__ = ["CacheStats", "ResultCache", "cached"]
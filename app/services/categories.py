@@ -22,10 +22,12 @@ class CategoryService:
             "INSERT INTO categories(name, type) VALUES(?, ?)",
             (name, cat_type),
         )
+        self.db.bump_data_version()
         return int(cur.lastrowid)
 
     def delete_category(self, category_id: int) -> None:
         self.db.execute("DELETE FROM categories WHERE id=?", (category_id,))
+        self.db.bump_data_version()
 
 
 __all__ = ["CategoryService"]
@@ -18,13 +18,14 @@ class CounterpartyService:
         return [Counterparty(id=row["id"], name=row["name"], type=row["type"]) for row in rows]
 
     def upsert(self, name: str, cp_type: str | None = None) -> int:
-        rows = self.db.query("SELECT id FROM counterparties WHERE name=?", (name,))
-        if rows:
-            cp_id = rows[0]["id"]
-            self.db.execute("UPDATE counterparties SET type=? WHERE id=?", (cp_type, cp_id))
-            return int(cp_id)
-        cur = self.db.execute("INSERT INTO counterparties(name, type) VALUES(?, ?)", (name, cp_type))
-        return int(cur.lastrowid)
+        with self.db.batch():
+            rows = self.db.query("SELECT id FROM counterparties WHERE name=?", (name,))
+            if rows:
+                cp_id = rows[0]["id"]
+                self.db.execute("UPDATE counterparties SET type=? WHERE id=?", (cp_type, cp_id))
+                return int(cp_id)
+            cur = self.db.execute("INSERT INTO counterparties(name, type) VALUES(?, ?)", (name, cp_type))
+            return int(cur.lastrowid)
 
 
 __all__ = ["CounterpartyService"]
@@ -12,6 +12,7 @@ from reportlab.pdfgen import canvas
 
 from app.db.database import Database
 from app.models.entities import Transaction
+from app.utils.money import format_cents
 
 
 @dataclass(slots=True)
@@ -29,7 +30,7 @@ class ExportService:
     def export_all_transactions(self, path: Path) -> None:
         rows = self.db.query(
             """
-            SELECT t.date, t.label, t.amount, c.name as categorie, cp.name as tiers,
+            SELECT t.date, t.label, t.amount_cents, c.name as categorie, cp.name as tiers,
                    t.payment_method, t.note, t.attachment, t.reconciled, t.external_ref
             FROM transactions t
             LEFT JOIN categories c ON c.id = t.category_id
@@ -58,7 +59,7 @@ class ExportService:
                     [
                         row["date"],
                         row["label"],
-                        f"{row['amount']:.2f}",
+                        format_cents(row["amount_cents"]),
                         row["categorie"],
                         row["tiers"],
                         row["payment_method"],
@@ -91,7 +92,7 @@ class ExportService:
                         row["number"] or "",
                         row["client"] or "",
                         row["label"],
-                        f"{row['amount']:.2f}",
+                        format_cents(row["amount_cents"]),
                         row["payment_method"],
                         row["external_ref"] or "",
                     ]
@@ -116,7 +117,7 @@ class ExportService:
                     row["number"] or "",
                     (row["client"] or "")[:18],
                     row["label"][:28],
-                    f"{row['amount']:.2f}",
+                    format_cents(row["amount_cents"]),
                     row["payment_method"][:12],
                     (row["external_ref"] or "")[:12],
                 ]
@@ -132,24 +133,24 @@ class ExportService:
         if period:
             return self.db.query(
                 """
-                SELECT t.date, i.number, cp.name as client, t.label, t.amount,
+                SELECT t.date, i.number, cp.name as client, t.label, t.amount_cents,
                        t.payment_method, t.external_ref
                 FROM transactions t
                 LEFT JOIN invoices i ON i.id = t.external_ref
                 LEFT JOIN counterparties cp ON cp.id = t.counterparty_id
-                WHERE t.date BETWEEN ? AND ? AND t.amount > 0
+                WHERE t.date BETWEEN ? AND ? AND t.amount_cents > 0
                 ORDER BY t.date ASC
                 """,
                 (period.start, period.end),
             )
         return self.db.query(
             """
-            SELECT t.date, i.number, cp.name as client, t.label, t.amount,
+            SELECT t.date, i.number, cp.name as client, t.label, t.amount_cents,
                    t.payment_method, t.external_ref
             FROM transactions t
             LEFT JOIN invoices i ON i.id = t.external_ref
             LEFT JOIN counterparties cp ON cp.id = t.counterparty_id
-            WHERE t.amount > 0
+            WHERE t.amount_cents > 0
             ORDER BY t.date ASC
             """
         )
@@ -5,13 +5,19 @@ import csv
 import logging
 from dataclasses import dataclass
 from decimal import Decimal
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Sequence
 
 from app.models.entities import Transaction
 
+if TYPE_CHECKING:
+    from app.services.transactions import TransactionService
+
 LOGGER = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 1000
+
 
 @dataclass(slots=True)
 class CSVMapping:
@@ -26,6 +32,24 @@ class CSVMapping:
     invert_amount: bool = False
 
 
+@dataclass(slots=True)
+class ImportProgress:
+    """State of a chunked import after a committed chunk."""
+
+    offset: int
+    chunk_index: int
+    chunk_rows: int
+
+
+class ImportInterrupted(Exception):
+    """Raised when a chunked import fails; ``offset`` is where to resume."""
+
+    def __init__(self, offset: int, cause: BaseException) -> None:
+        super().__init__(f"Import interrompu à la ligne {offset}: {cause}")
+        self.offset = offset
+        self.cause = cause
+
+
 class CSVImportService:
     """Parse CSV files and convert them to transactions."""
 
@@ -42,35 +66,88 @@ class CSVImportService:
             return rows
 
     def parse(self, path: Path, mapping: CSVMapping) -> List[Transaction]:
+        return list(self.iter_parse(path, mapping))
+
+    def iter_parse(self, path: Path, mapping: CSVMapping, start_offset: int = 0) -> Iterator[Transaction]:
+        """Yield transactions one by one, skipping the first ``start_offset`` data rows."""
         LOGGER.info("Import CSV depuis %s", path)
-        transactions: List[Transaction] = []
         with path.open("r", encoding=self.encoding, newline="") as handle:
             reader = csv.DictReader(handle, delimiter=self.delimiter)
-            for row in reader:
-                amount_raw = row.get(mapping.amount_column, "0").replace(",", ".")
-                amount = Decimal(amount_raw)
-                if mapping.invert_amount:
-                    amount *= Decimal("-1")
-                transactions.append(
-                    Transaction(
-                        id=None,
-                        date=row[mapping.date_column],
-                        label=row[mapping.label_column],
-                        amount=amount,
-                        category_id=mapping.category_id,
-                        counterparty_id=None,
-                        payment_method=row.get(mapping.payment_method_column or "", "")
-                        if mapping.payment_method_column
-                        else "",
-                        note=row.get(mapping.note_column, "") if mapping.note_column else "",
-                        attachment=row.get(mapping.attachment_column, None)
-                        if mapping.attachment_column
-                        else None,
-                        reconciled=False,
-                        external_ref=None,
-                    )
-                )
-        return transactions
-
-
-__all__ = ["CSVImportService", "CSVMapping"]
+            for row in islice(reader, start_offset, None):
+                yield self._row_to_transaction(row, mapping)
+
+    def iter_chunks(
+        self,
+        path: Path,
+        mapping: CSVMapping,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_offset: int = 0,
+    ) -> Iterator[List[Transaction]]:
+        if chunk_size <= 0:
+            raise ValueError("La taille de lot doit être positive")
+        transactions = self.iter_parse(path, mapping, start_offset)
+        while True:
+            chunk = list(islice(transactions, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def import_file(
+        self,
+        path: Path,
+        mapping: CSVMapping,
+        tx_service: TransactionService,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_offset: int = 0,
+        progress: Callable[[ImportProgress], None] | None = None,
+    ) -> int:
+        """Parse and insert ``path`` chunk by chunk, committing after each chunk.
+
+        Returns the offset reached (number of data rows consumed). On failure an
+        :class:`ImportInterrupted` carries the offset of the last committed chunk
+        so the import can be resumed with ``start_offset``.
+        """
+        offset = start_offset
+        chunk_index = 0
+        chunks = self.iter_chunks(path, mapping, chunk_size, start_offset)
+        while True:
+            try:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                tx_service.bulk_insert(chunk)
+            except Exception as exc:
+                LOGGER.exception("Import CSV interrompu après %s lignes", offset)
+                raise ImportInterrupted(offset, exc) from exc
+            offset += len(chunk)
+            if progress is not None:
+                progress(ImportProgress(offset=offset, chunk_index=chunk_index, chunk_rows=len(chunk)))
+            chunk_index += 1
+        LOGGER.info("Import CSV terminé: %s lignes", offset - start_offset)
+        return offset
+
+    def _row_to_transaction(self, row: Dict[str, str], mapping: CSVMapping) -> Transaction:
+        amount_raw = row.get(mapping.amount_column, "0").replace(",", ".")
+        amount = Decimal(amount_raw)
+        if mapping.invert_amount:
+            amount *= Decimal("-1")
+        return Transaction(
+            id=None,
+            date=row[mapping.date_column],
+            label=row[mapping.label_column],
+            amount=amount,
+            category_id=mapping.category_id,
+            counterparty_id=None,
+            payment_method=row.get(mapping.payment_method_column or "", "")
+            if mapping.payment_method_column
+            else "",
+            note=row.get(mapping.note_column, "") if mapping.note_column else "",
+            attachment=row.get(mapping.attachment_column, None)
+            if mapping.attachment_column
+            else None,
+            reconciled=False,
+            external_ref=None,
+        )
+
+
+__all__ = ["CSVImportService", "CSVMapping", "ImportInterrupted", "ImportProgress"]
@@ -0,0 +1,227 @@
+"""Incremental, content-addressed backups of the database file."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from app.db.database import Database, check_integrity
+from app.services.backups import BackupIntegrityError, Progress
+from app.services.categories import CategoryService
+from app.services.settings import SettingsService
+from app.utils.paths import BACKUP_DIR
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+SNAPSHOT_FORMAT = "%Y%m%d-%H%M%S"
+
+
+@dataclass(slots=True)
+class Snapshot:
+    name: str
+    created: str
+    size: int
+    sha256: str
+    chunk_size: int
+    chunks: List[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SnapshotStats:
+    chunks_total: int
+    chunks_written: int
+    bytes_written: int
+
+
+class IncrementalBackupService:
+    """Store database snapshots as shared, hash-named chunks plus one manifest each.
+
+    The file is cut into fixed-size chunks: SQLite rewrites pages in place, so
+    unchanged regions keep the same hash from one snapshot to the next and are
+    stored only once.
+    """
+
+    def __init__(self, db: Database, store_dir: Path | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.db = db
+        self.store_dir = store_dir or BACKUP_DIR / "incremental"
+        self.chunk_size = chunk_size
+        self.chunks_dir = self.store_dir / "chunks"
+        self.snapshots_dir = self.store_dir / "snapshots"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        self.last_stats: SnapshotStats | None = None
+
+    def create_snapshot(self, progress: Progress | None = None) -> Snapshot:
+        """Take an online copy of the database, verify it, then store its new chunks."""
+        pending = self.store_dir / "pending.db"
+        self.db.backup_to(pending, progress=progress)
+        try:
+            problems = check_integrity(pending)
+            if problems:
+                raise BackupIntegrityError(f"Copie de la base invalide: {problems[0]}")
+            return self._store_file(pending)
+        finally:
+            pending.unlink(missing_ok=True)
+
+    def _store_file(self, source: Path) -> Snapshot:
+        name = datetime.now().strftime(SNAPSHOT_FORMAT)
+        while (self.snapshots_dir / f"{name}.json").exists():
+            name = f"{name}-1"
+        whole = hashlib.sha256()
+        chunks: List[str] = []
+        written = bytes_written = size = 0
+        with source.open("rb") as handle:
+            while block := handle.read(self.chunk_size):
+                size += len(block)
+                whole.update(block)
+                digest = hashlib.sha256(block).hexdigest()
+                chunks.append(digest)
+                stored = self._store_chunk(digest, block)
+                if stored:
+                    written += 1
+                    bytes_written += stored
+        snapshot = Snapshot(
+            name=name,
+            created=datetime.now().isoformat(timespec="seconds"),
+            size=size,
+            sha256=whole.hexdigest(),
+            chunk_size=self.chunk_size,
+            chunks=chunks,
+            metadata={
+                "settings": SettingsService(self.db).export_settings(),
+                "categories": [asdict(cat) for cat in CategoryService(self.db).list_categories()],
+            },
+        )
+        self._write_json(self.snapshots_dir / f"{name}.json", asdict(snapshot))
+        self.last_stats = SnapshotStats(len(chunks), written, bytes_written)
+        LOGGER.info(
+            "Snapshot %s: %s blocs dont %s nouveaux (%s octets écrits)", name, len(chunks), written, bytes_written
+        )
+        return snapshot
+
+    def list_snapshots(self) -> List[Snapshot]:
+        return [self.load_snapshot(path.stem) for path in sorted(self.snapshots_dir.glob("*.json"))]
+
+    def load_snapshot(self, name: str) -> Snapshot:
+        with (self.snapshots_dir / f"{name}.json").open("r", encoding="utf-8") as handle:
+            return Snapshot(**json.load(handle))
+
+    def restore_snapshot(self, name: str, target: Path | None = None) -> None:
+        """Rebuild the database file of snapshot ``name`` (by default over the live one)."""
+        snapshot = self.load_snapshot(name)
+        target = Path(target or self.db.db_path)
+        temp = target.with_name(target.name + ".restore")
+        whole = hashlib.sha256()
+        with temp.open("wb") as handle:
+            for digest in snapshot.chunks:
+                block = self._read_chunk(digest)
+                whole.update(block)
+                handle.write(block)
+        if whole.hexdigest() != snapshot.sha256:
+            temp.unlink()
+            raise ValueError(f"Snapshot {name} corrompu")
+        if target != Path(self.db.db_path):
+            os.replace(temp, target)
+        else:
+            # Overwrite in place, like the zip restore, so the open connection sees the new content.
+            self.db.checkpoint()
+            shutil.copyfile(temp, target)
+            temp.unlink()
+            self.db.bump_data_version()
+            SettingsService(self.db).import_settings(snapshot.metadata.get("settings", {}))
+        LOGGER.info("Snapshot %s restauré vers %s", name, target)
+
+    def prune(self, keep_last: int = 7, keep_days: int = 30) -> List[str]:
+        """Keep the ``keep_last`` newest snapshots plus the newest of each of the last ``keep_days`` days.
+
+        Chunks no longer referenced by a remaining snapshot are deleted.
+        Returns the names of the removed snapshots.
+        """
+        names = sorted(path.stem for path in self.snapshots_dir.glob("*.json"))
+        keep: Set[str] = set(names[-keep_last:]) if keep_last > 0 else set()
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y%m%d")
+        newest_per_day: Dict[str, str] = {}
+        for name in names:
+            day = name[:8]
+            if day >= cutoff:
+                newest_per_day[day] = name
+        keep.update(newest_per_day.values())
+        removed = [name for name in names if name not in keep]
+        for name in removed:
+            (self.snapshots_dir / f"{name}.json").unlink()
+        self._collect_garbage()
+        if removed:
+            LOGGER.info("Rétention: %s snapshot(s) supprimé(s)", len(removed))
+        return removed
+
+    def verify(self, name: str | None = None) -> List[str]:
+        """Check chunk presence and hashes; return a list of problems (empty if sound)."""
+        problems: List[str] = []
+        snapshots = [self.load_snapshot(name)] if name else self.list_snapshots()
+        checked: Dict[str, bool] = {}
+        for snapshot in snapshots:
+            whole = hashlib.sha256()
+            complete = True
+            for digest in snapshot.chunks:
+                try:
+                    block = self._read_chunk(digest)
+                except (OSError, zlib.error):
+                    block = None
+                ok = block is not None and hashlib.sha256(block).hexdigest() == digest
+                if digest not in checked:
+                    checked[digest] = ok
+                    if not ok:
+                        problems.append(f"bloc {digest[:12]} manquant ou altéré")
+                if not ok:
+                    complete = False
+                    continue
+                whole.update(block)
+            if complete and whole.hexdigest() != snapshot.sha256:
+                problems.append(f"snapshot {snapshot.name}: empreinte globale incorrecte")
+            elif not complete:
+                problems.append(f"snapshot {snapshot.name}: incomplet")
+        return problems
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _store_chunk(self, digest: str, block: bytes) -> int:
+        path = self._chunk_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(exist_ok=True)
+        data = zlib.compress(block, 1)
+        temp = path.with_suffix(".tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+        return len(data)
+
+    def _read_chunk(self, digest: str) -> bytes:
+        return zlib.decompress(self._chunk_path(digest).read_bytes())
+
+    def _collect_garbage(self) -> None:
+        referenced: Set[str] = set()
+        for snapshot in self.list_snapshots():
+            referenced.update(snapshot.chunks)
+        for path in self.chunks_dir.glob("*/*"):
+            if path.name not in referenced:
+                path.unlink()
+
+    @staticmethod
+    def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+        temp = path.with_suffix(".tmp")
+        with temp.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, ensure_ascii=False)
+        os.replace(temp, path)
+
+
+__all__ = ["IncrementalBackupService", "Snapshot", "SnapshotStats"]
@@ -1,27 +1,172 @@
 """Reconciliation helpers."""
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
 from decimal import Decimal
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 from app.models.entities import Transaction
+from app.utils.money import to_cents
 
 
 def reconcile(transactions: List[Transaction], tolerance: Decimal) -> List[int]:
     """Return IDs of transactions considered reconciled based on amount tolerance."""
     reconciled_ids: List[int] = []
-    seen: set[Decimal] = set()
+    seen: List[int] = []
+    tol = to_cents(tolerance)
     for tx in transactions:
-        key = tx.amount.quantize(Decimal("0.01"))
-        for existing in list(seen):
-            if abs(existing - key) <= tolerance:
-                if tx.id is not None:
-                    reconciled_ids.append(tx.id)
-                break
-        else:
+        key = to_cents(tx.amount)
+        pos = bisect_left(seen, key - tol)
+        if pos < len(seen) and seen[pos] <= key + tol:
             if tx.id is not None:
-                seen.add(key)
+                reconciled_ids.append(tx.id)
+        elif tx.id is not None:
+            insort(seen, key)
     return reconciled_ids
 
 
-__all__ = ["reconcile"]
+@dataclass(slots=True)
+class Match:
+    bank: Transaction
+    book: List[Transaction]
+    amount_diff: Decimal
+    day_diff: int
+
+
+@dataclass(slots=True)
+class ReconciliationResult:
+    matches: List[Match] = field(default_factory=list)
+    unmatched_bank: List[Transaction] = field(default_factory=list)
+    unmatched_book: List[Transaction] = field(default_factory=list)
+
+
+class _BookIndex:
+    """Book entries indexed by amount (cents), then by day, with lazy removal."""
+
+    def __init__(self, entries: Sequence[Transaction]) -> None:
+        self.entries = list(entries)
+        self.amounts = [to_cents(tx.amount) for tx in self.entries]
+        self.days = [_day(tx.date) for tx in self.entries]
+        self.used = [False] * len(self.entries)
+        by_amount: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for idx, (cents, day) in enumerate(zip(self.amounts, self.days)):
+            by_amount[cents].append((day, idx))
+        for bucket in by_amount.values():
+            bucket.sort()
+        self.by_amount = dict(by_amount)
+        self.amount_keys = sorted(self.by_amount)
+        self.by_day = sorted((day, idx) for idx, day in enumerate(self.days))
+
+    def best_single(self, cents: int, day: int, tolerance: int, window: int) -> int | None:
+        best: Tuple[int, int, int] | None = None
+        lo = bisect_left(self.amount_keys, cents - tolerance)
+        hi = bisect_right(self.amount_keys, cents + tolerance)
+        for key in self.amount_keys[lo:hi]:
+            bucket = self.by_amount[key]
+            start = bisect_left(bucket, (day - window, -1))
+            for cand_day, idx in bucket[start:]:
+                if cand_day > day + window:
+                    break
+                if self.used[idx]:
+                    continue
+                score = (abs(key - cents), abs(cand_day - day), idx)
+                if best is None or score < best:
+                    best = score
+        return None if best is None else best[2]
+
+    def best_split(self, cents: int, day: int, tolerance: int, window: int, max_parts: int) -> List[int] | None:
+        lo = bisect_left(self.by_day, (day - window, -1))
+        hi = bisect_right(self.by_day, (day + window, len(self.entries)))
+        candidates = sorted(
+            (self.amounts[idx], idx)
+            for _, idx in self.by_day[lo:hi]
+            if not self.used[idx] and (self.amounts[idx] > 0) == (cents > 0)
+        )
+        if max_parts >= 2:
+            found = _two_sum(candidates, cents, tolerance, 0)
+            if found:
+                return found
+        if max_parts >= 3 and len(candidates) <= 120:
+            for first in range(len(candidates)):
+                rest = cents - candidates[first][0]
+                found = _two_sum(candidates, rest, tolerance, first + 1)
+                if found:
+                    return [candidates[first][1], *found]
+        return None
+
+
+def _two_sum(candidates: List[Tuple[int, int]], target: int, tolerance: int, start: int) -> List[int] | None:
+    left, right = start, len(candidates) - 1
+    while left < right:
+        total = candidates[left][0] + candidates[right][0]
+        if abs(total - target) <= tolerance:
+            return [candidates[left][1], candidates[right][1]]
+        if total < target:
+            left += 1
+        else:
+            right -= 1
+    return None
+
+
+def _day(value: str) -> int:
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def match_statement(
+    bank_lines: Iterable[Transaction],
+    book_entries: Iterable[Transaction],
+    tolerance: Decimal,
+    date_window_days: int = 5,
+    max_parts: int = 2,
+) -> ReconciliationResult:
+    """Match bank statement lines to book entries.
+
+    Each bank line is first paired with the closest unused book entry whose
+    amount is within ``tolerance`` and whose date is within
+    ``date_window_days``. Lines left over are then matched to up to
+    ``max_parts`` book entries of the window whose sum fits the tolerance
+    (one-to-many, e.g. a single transfer paying several invoices). Candidates
+    come from a sorted amount index and bisect lookups, so the cost grows as
+    ``n log n`` rather than comparing every pair.
+    """
+    bank = list(bank_lines)
+    index = _BookIndex(list(book_entries))
+    tol = to_cents(tolerance)
+    result = ReconciliationResult()
+    pending: List[Tuple[Transaction, int, int]] = []
+    order = sorted(range(len(bank)), key=lambda i: (bank[i].date, i))
+    for i in order:
+        line = bank[i]
+        cents, day = to_cents(line.amount), _day(line.date)
+        idx = index.best_single(cents, day, tol, date_window_days)
+        if idx is None:
+            pending.append((line, cents, day))
+            continue
+        index.used[idx] = True
+        result.matches.append(_match(line, [idx], cents, day, index))
+    for line, cents, day in pending:
+        parts = index.best_split(cents, day, tol, date_window_days, max_parts) if max_parts > 1 else None
+        if parts is None:
+            result.unmatched_bank.append(line)
+            continue
+        for idx in parts:
+            index.used[idx] = True
+        result.matches.append(_match(line, parts, cents, day, index))
+    result.unmatched_book = [tx for idx, tx in enumerate(index.entries) if not index.used[idx]]
+    return result
+
+
+def _match(line: Transaction, ids: List[int], cents: int, day: int, index: _BookIndex) -> Match:
+    total = sum(index.amounts[idx] for idx in ids)
+    return Match(
+        bank=line,
+        book=[index.entries[idx] for idx in ids],
+        amount_diff=Decimal(total - cents).scaleb(-2),
+        day_diff=max(abs(index.days[idx] - day) for idx in ids),
+    )
+
+
+__all__ = ["Match", "ReconciliationResult", "match_statement", "reconcile"]
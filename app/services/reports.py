@@ -1,63 +1,161 @@
 """Reporting utilities."""
 from __future__ import annotations
 
+import logging
 from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Dict, List, Tuple
 
 from app.db.database import Database
+from app.db.migrations import MONTHLY_TOTALS_SELECT
+from app.services.cache import ResultCache, cached
+from app.utils.money import from_cents
+
+LOGGER = logging.getLogger(__name__)
+
+
+def split_period(start: str, end: str) -> Tuple[Tuple[str, str] | None, List[Tuple[str, str]]]:
+    """Split ``[start, end]`` into whole months and the leftover day ranges.
+
+    Returns ``(months, ranges)``: ``months`` is an inclusive ``(YYYY-MM, YYYY-MM)``
+    span answered from ``monthly_totals`` (or ``None``), ``ranges`` are
+    half-open ``[from, to)`` date ranges to aggregate from ``transactions``.
+    """
+    try:
+        first = date.fromisoformat(start)
+        last = date.fromisoformat(end)
+    except ValueError:
+        return None, [(start, end + "\U0010ffff")]
+    if first > last:
+        return None, []
+    month_start = first if first.day == 1 else _next_month(first)
+    month_end = _next_month(last) if _next_month(last) - timedelta(days=1) == last else last.replace(day=1)
+    if month_start >= month_end:
+        return None, [(first.isoformat(), (last + timedelta(days=1)).isoformat())]
+    ranges = []
+    if first < month_start:
+        ranges.append((first.isoformat(), month_start.isoformat()))
+    if month_end <= last:
+        ranges.append((month_end.isoformat(), (last + timedelta(days=1)).isoformat()))
+    months = (month_start.isoformat()[:7], (month_end - timedelta(days=1)).isoformat()[:7])
+    return months, ranges
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
 
 
 class ReportService:
     """Compute aggregated data for dashboard and reports."""
 
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, cache: ResultCache | None = None) -> None:
         self.db = db
+        self.cache = cache
 
+    @cached
     def totals_by_period(self, start: str, end: str) -> Dict[str, Decimal]:
-        rows = self.db.query(
-            """
-            SELECT SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END) as recettes,
-                   SUM(CASE WHEN amount < 0 THEN amount ELSE 0 END) as depenses,
-                   SUM(amount) as solde
-            FROM transactions
-            WHERE date BETWEEN ? AND ?
-            """,
-            (start, end),
-        )
-        row = rows[0]
+        recettes = depenses = 0
+        for _, rec, dep in self._category_totals(start, end):
+            recettes += rec
+            depenses += dep
         return {
-            "recettes": Decimal(str(row["recettes"] or 0)).quantize(Decimal("0.01")),
-            "depenses": Decimal(str(row["depenses"] or 0)).quantize(Decimal("0.01")),
-            "solde": Decimal(str(row["solde"] or 0)).quantize(Decimal("0.01")),
+            "recettes": from_cents(recettes),
+            "depenses": from_cents(depenses),
+            "solde": from_cents(recettes + depenses),
         }
 
+    @cached
     def totals_by_category(self, start: str, end: str) -> List[Tuple[str, Decimal]]:
-        rows = self.db.query(
-            """
-            SELECT c.name, SUM(t.amount) as total
-            FROM transactions t
-            LEFT JOIN categories c ON c.id = t.category_id
-            WHERE t.date BETWEEN ? AND ?
-            GROUP BY c.name
-            ORDER BY total DESC
-            """,
-            (start, end),
-        )
-        return [(row["name"], Decimal(str(row["total"] or 0))) for row in rows]
+        totals: Dict[int, int] = defaultdict(int)
+        for category_id, rec, dep in self._category_totals(start, end):
+            totals[category_id] += rec + dep
+        names = {row["id"]: row["name"] for row in self.db.query("SELECT id, name FROM categories")}
+        merged: Dict[str | None, int] = defaultdict(int)
+        for category_id, total in totals.items():
+            merged[names.get(category_id)] += total
+        items = sorted(merged.items(), key=lambda item: item[1], reverse=True)
+        return [(name, from_cents(total)) for name, total in items]
 
+    @cached
     def monthly_balance(self, year: str) -> List[Tuple[str, Decimal]]:
         rows = self.db.query(
             """
-            SELECT substr(date, 1, 7) as month, SUM(amount) as total
-            FROM transactions
-            WHERE substr(date, 1, 4) = ?
+            SELECT month, SUM(recettes_cents + depenses_cents) as total
+            FROM monthly_totals
+            WHERE month BETWEEN ? AND ?
             GROUP BY month
             ORDER BY month
             """,
-            (year,),
+            (f"{year}-01", f"{year}-12"),
+        )
+        return [(row["month"], from_cents(row["total"])) for row in rows]
+
+    def verify_monthly_totals(self) -> List[Tuple[str, int]]:
+        """Return the ``(month, category_id)`` keys whose stored totals are stale."""
+        rows = self.db.query(
+            f"""
+            WITH fresh AS ({MONTHLY_TOTALS_SELECT} WHERE date IS NOT NULL GROUP BY 1, 2),
+            stored AS (
+                SELECT month, category_id, recettes_cents, depenses_cents, tx_count FROM monthly_totals
+            ),
+            diff AS (
+                SELECT * FROM (SELECT * FROM fresh EXCEPT SELECT * FROM stored)
+                UNION
+                SELECT * FROM (SELECT * FROM stored EXCEPT SELECT * FROM fresh)
+            )
+            SELECT DISTINCT month, category_id FROM diff ORDER BY month, category_id
+            """
         )
-        return [(row["month"], Decimal(str(row["total"] or 0))) for row in rows]
+        return [(row["month"], row["category_id"]) for row in rows]
+
+    def rebuild_monthly_totals(self) -> None:
+        LOGGER.info("Reconstruction des agrégats mensuels")
+        with self.db.batch():
+            self.db.execute("DELETE FROM monthly_totals")
+            self.db.execute(
+                f"""
+                INSERT INTO monthly_totals(month, category_id, recettes_cents, depenses_cents, tx_count)
+                {MONTHLY_TOTALS_SELECT}
+                WHERE date IS NOT NULL
+                GROUP BY 1, 2
+                """
+            )
+        self.db.bump_data_version()
+
+    def _category_totals(self, start: str, end: str) -> List[Tuple[int, int, int]]:
+        """Return ``(category_id, recettes_cents, depenses_cents)`` rows for the period."""
+        months, ranges = split_period(start, end)
+        rows: List[Tuple[int, int, int]] = []
+        if months is not None:
+            rows.extend(
+                (row[0], row[1], row[2])
+                for row in self.db.query(
+                    """
+                    SELECT category_id, SUM(recettes_cents), SUM(depenses_cents)
+                    FROM monthly_totals
+                    WHERE month BETWEEN ? AND ?
+                    GROUP BY category_id
+                    """,
+                    months,
+                )
+            )
+        for range_start, range_end in ranges:
+            rows.extend(
+                (row[0], row[1] or 0, row[2] or 0)
+                for row in self.db.query(
+                    """
+                    SELECT COALESCE(category_id, 0),
+                           SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END),
+                           SUM(CASE WHEN amount_cents < 0 THEN amount_cents ELSE 0 END)
+                    FROM transactions
+                    WHERE date >= ? AND date < ?
+                    GROUP BY 1
+                    """,
+                    (range_start, range_end),
+                )
+            )
+        return rows
 
 
-__all__ = ["ReportService"]
+__all__ = ["ReportService", "split_period"]
@@ -2,16 +2,22 @@
 from __future__ import annotations
 
 import json
+import logging
 from typing import Any, Dict
 
-from app.db.database import Database
+from app.db.database import DEFAULT_PROFILE, PERFORMANCE_PROFILES, Database
+
+LOGGER = logging.getLogger(__name__)
 
 DEFAULT_SETTINGS: Dict[str, Any] = {
     "devise": "€",
     "regime": "auto-entrepreneur",
     "seuil_tva": "36500",
     "tolerance_rapprochement": "0.50",
+    "fenetre_rapprochement_jours": "5",
     "dossier_backups": "",
+    "mode_backup": "zip",
+    "profil_performance": DEFAULT_PROFILE,
 }
 
 
@@ -34,6 +40,15 @@ class SettingsService:
     def set_setting(self, key: str, value: str) -> None:
         self.db.execute("INSERT OR REPLACE INTO settings(key, value) VALUES(?, ?)", (key, value))
 
+    def apply_performance_profile(self) -> str:
+        """Apply the SQLite profile named in settings to the open connection."""
+        name = self.get_setting("profil_performance")
+        if name not in PERFORMANCE_PROFILES:
+            LOGGER.warning("Profil SQLite inconnu %r, utilisation de %r", name, DEFAULT_PROFILE)
+            name = DEFAULT_PROFILE
+        self.db.apply_profile(PERFORMANCE_PROFILES[name])
+        return name
+
     def export_settings(self) -> Dict[str, Any]:
         rows = self.db.query("SELECT key, value FROM settings")
         data = {row["key"]: row["value"] for row in rows}
@@ -42,8 +57,9 @@ class SettingsService:
         return data
 
     def import_settings(self, data: Dict[str, Any]) -> None:
-        for key, value in data.items():
-            self.set_setting(key, str(value))
+        with self.db.batch():
+            for key, value in data.items():
+                self.set_setting(key, str(value))
 
 
 __all__ = ["SettingsService", "DEFAULT_SETTINGS"]
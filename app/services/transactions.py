@@ -2,15 +2,28 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import asdict
+import re
+from dataclasses import asdict, dataclass
 from decimal import Decimal
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from app.db.database import Database
 from app.models.entities import Transaction
+from app.utils.money import from_cents, to_cents
 
 LOGGER = logging.getLogger(__name__)
 
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(slots=True)
+class TransactionFilters:
+    start: str | None = None
+    end: str | None = None
+    category_id: int | None = None
+    min_amount: Decimal | None = None
+    max_amount: Decimal | None = None
+
 
 class TransactionService:
     """Provide CRUD for transactions."""
@@ -21,7 +34,7 @@ class TransactionService:
     def list_transactions(self, limit: int = 200, offset: int = 0) -> List[Transaction]:
         rows = self.db.query(
             """
-            SELECT id, date, label, amount, category_id, counterparty_id, payment_method,
+            SELECT id, date, label, amount_cents, category_id, counterparty_id, payment_method,
                    note, attachment, reconciled, external_ref
             FROM transactions
             ORDER BY date DESC, id DESC
@@ -31,19 +44,89 @@ class TransactionService:
         )
         return [self._row_to_transaction(row) for row in rows]
 
+    def list_transactions_page(
+        self, after: Tuple[str, int] | None = None, limit: int = 200
+    ) -> List[Transaction]:
+        """Return the next page in ``(date DESC, id DESC)`` order after the ``(date, id)`` key.
+
+        Keyset pagination walks ``idx_tx_date`` from the last key seen, so every
+        page costs the same whatever its depth, unlike ``OFFSET``.
+        """
+        if after is None:
+            return self.list_transactions(limit=limit)
+        rows = self.db.query(
+            """
+            SELECT id, date, label, amount_cents, category_id, counterparty_id, payment_method,
+                   note, attachment, reconciled, external_ref
+            FROM transactions
+            WHERE (date, id) < (?, ?)
+            ORDER BY date DESC, id DESC
+            LIMIT ?
+            """,
+            (after[0], after[1], limit),
+        )
+        return [self._row_to_transaction(row) for row in rows]
+
+    def search(
+        self, query: str, filters: TransactionFilters | None = None, limit: int = 100
+    ) -> List[Transaction]:
+        """Full-text search on label, note and counterparty, best matches first.
+
+        Every word of ``query`` must match, as a prefix, in any of the indexed
+        columns; label hits weigh more than counterparty and note hits.
+        """
+        match = " ".join(f'"{token}"*' for token in _SEARCH_TOKEN.findall(query))
+        if not match:
+            return []
+        clauses = ["transactions_fts MATCH ?"]
+        params: list = [match]
+        filters = filters or TransactionFilters()
+        if filters.start:
+            clauses.append("t.date >= ?")
+            params.append(filters.start)
+        if filters.end:
+            clauses.append("t.date <= ?")
+            params.append(filters.end)
+        if filters.category_id is not None:
+            clauses.append("t.category_id = ?")
+            params.append(filters.category_id)
+        if filters.min_amount is not None:
+            clauses.append("t.amount_cents >= ?")
+            params.append(to_cents(filters.min_amount))
+        if filters.max_amount is not None:
+            clauses.append("t.amount_cents <= ?")
+            params.append(to_cents(filters.max_amount))
+        params.append(limit)
+        rows = self.db.query(
+            f"""
+            SELECT t.id, t.date, t.label, t.amount_cents, t.category_id, t.counterparty_id,
+                   t.payment_method, t.note, t.attachment, t.reconciled, t.external_ref
+            FROM transactions_fts
+            JOIN transactions t ON t.id = transactions_fts.rowid
+            WHERE {" AND ".join(clauses)}
+            ORDER BY bm25(transactions_fts, 10.0, 2.0, 5.0), t.date DESC
+            LIMIT ?
+            """,
+            tuple(params),
+        )
+        return [self._row_to_transaction(row) for row in rows]
+
+    def count_transactions(self) -> int:
+        return int(self.db.query("SELECT COUNT(*) FROM transactions")[0][0])
+
     def create_transaction(self, transaction: Transaction) -> int:
         LOGGER.info("Création transaction %s", transaction.label)
         cur = self.db.execute(
             """
             INSERT INTO transactions(
-                date, label, amount, category_id, counterparty_id, payment_method,
+                date, label, amount_cents, category_id, counterparty_id, payment_method,
                 note, attachment, reconciled, external_ref
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 transaction.date,
                 transaction.label,
-                float(transaction.amount),
+                to_cents(transaction.amount),
                 transaction.category_id,
                 transaction.counterparty_id,
                 transaction.payment_method,
@@ -53,6 +136,7 @@ class TransactionService:
                 transaction.external_ref,
             ),
         )
+        self.db.bump_data_version()
         return int(cur.lastrowid)
 
     def update_transaction(self, transaction: Transaction) -> None:
@@ -62,14 +146,14 @@ class TransactionService:
         self.db.execute(
             """
             UPDATE transactions SET
-                date=?, label=?, amount=?, category_id=?, counterparty_id=?,
+                date=?, label=?, amount_cents=?, category_id=?, counterparty_id=?,
                 payment_method=?, note=?, attachment=?, reconciled=?, external_ref=?
             WHERE id=?
             """,
             (
                 transaction.date,
                 transaction.label,
-                float(transaction.amount),
+                to_cents(transaction.amount),
                 transaction.category_id,
                 transaction.counterparty_id,
                 transaction.payment_method,
@@ -80,38 +164,46 @@ class TransactionService:
                 transaction.id,
             ),
         )
+        self.db.bump_data_version()
 
     def delete_transaction(self, transaction_id: int) -> None:
         LOGGER.info("Suppression transaction %s", transaction_id)
         self.db.execute("DELETE FROM transactions WHERE id=?", (transaction_id,))
+        self.db.bump_data_version()
 
-    def bulk_insert(self, transactions: Iterable[Transaction]) -> None:
-        to_insert = [
-            (
-                t.date,
-                t.label,
-                float(t.amount),
-                t.category_id,
-                t.counterparty_id,
-                t.payment_method,
-                t.note,
-                t.attachment,
-                int(t.reconciled),
-                t.external_ref,
-            )
-            for t in transactions
-        ]
-        if to_insert:
-            LOGGER.info("Insertion en lot de %s transactions", len(to_insert))
-            self.db.executemany(
-                """
-                INSERT INTO transactions(
-                    date, label, amount, category_id, counterparty_id, payment_method,
-                    note, attachment, reconciled, external_ref
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                to_insert,
-            )
+    def bulk_insert(self, transactions: Iterable[Transaction]) -> int:
+        count = 0
+
+        def rows():
+            nonlocal count
+            for t in transactions:
+                count += 1
+                yield (
+                    t.date,
+                    t.label,
+                    to_cents(t.amount),
+                    t.category_id,
+                    t.counterparty_id,
+                    t.payment_method,
+                    t.note,
+                    t.attachment,
+                    int(t.reconciled),
+                    t.external_ref,
+                )
+
+        self.db.executemany(
+            """
+            INSERT INTO transactions(
+                date, label, amount_cents, category_id, counterparty_id, payment_method,
+                note, attachment, reconciled, external_ref
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows(),
+        )
+        if count:
+            LOGGER.info("Insertion en lot de %s transactions", count)
+            self.db.bump_data_version()
+        return count
 
     def mark_reconciled(self, transaction_ids: Iterable[int]) -> None:
         ids = list(transaction_ids)
@@ -123,13 +215,14 @@ class TransactionService:
             f"UPDATE transactions SET reconciled=1 WHERE id IN ({placeholders})",
             tuple(ids),
         )
+        self.db.bump_data_version()
 
     def _row_to_transaction(self, row) -> Transaction:
         return Transaction(
             id=row["id"],
             date=row["date"],
             label=row["label"],
-            amount=Decimal(str(row["amount"])),
+            amount=from_cents(row["amount_cents"]),
             category_id=row["category_id"],
             counterparty_id=row["counterparty_id"],
             payment_method=row["payment_method"],
@@ -140,4 +233,4 @@ class TransactionService:
         )
 
 
-__all__ = ["TransactionService"]
+__all__ = ["TransactionFilters", "TransactionService"]
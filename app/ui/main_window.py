@@ -4,10 +4,19 @@ from __future__ import annotations
 import logging
 
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QListWidget, QListWidgetItem, QMainWindow, QStackedWidget
+from PySide6.QtWidgets import (
+    QApplication,
+    QListWidget,
+    QListWidgetItem,
+    QMainWindow,
+    QProgressBar,
+    QPushButton,
+    QStackedWidget,
+)
 
 from app.db.database import Database, bootstrap
 from app.services.backups import BackupService
+from app.services.cache import ResultCache
 from app.services.categories import CategoryService
 from app.services.reports import ReportService
 from app.services.settings import SettingsService
@@ -16,6 +25,7 @@ from app.ui.dashboard import DashboardView
 from app.ui.invoices import InvoicesView
 from app.ui.reports import ReportsView
 from app.ui.settings import SettingsView
+from app.ui.tasks import TaskRunner
 from app.ui.transactions import TransactionsView
 
 LOGGER = logging.getLogger(__name__)
@@ -30,13 +40,16 @@ class MainWindow(QMainWindow):
         self.resize(1024, 720)
 
         self.db = Database()
-        bootstrap(self.db)
+        bootstrap(self.db, progress=self._migration_progress)
 
         self.settings_service = SettingsService(self.db)
+        self.settings_service.apply_performance_profile()
         self.category_service = CategoryService(self.db)
         self.tx_service = TransactionService(self.db)
-        self.report_service = ReportService(self.db)
+        self.report_cache = ResultCache()
+        self.report_service = ReportService(self.db, self.report_cache)
         self.backup_service = BackupService(self.db)
+        self.tasks = TaskRunner(self.db.db_path)
 
         self.navigation = QListWidget()
         self.navigation.addItem(QListWidgetItem("Tableau de bord"))
@@ -49,10 +62,10 @@ class MainWindow(QMainWindow):
 
         self.stack = QStackedWidget()
         self.dashboard = DashboardView(self.report_service)
-        self.transactions = TransactionsView(self.tx_service, self.category_service)
+        self.transactions = TransactionsView(self.tx_service, self.category_service, self.tasks)
         self.invoices = InvoicesView()
         self.reports = ReportsView(self.report_service)
-        self.settings = SettingsView(self.settings_service, self.backup_service)
+        self.settings = SettingsView(self.settings_service, self.backup_service, self.tasks)
 
         self.stack.addWidget(self.dashboard)
         self.stack.addWidget(self.transactions)
@@ -69,6 +82,40 @@ class MainWindow(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        self.task_progress = QProgressBar()
+        self.task_progress.setMaximumWidth(200)
+        self.task_cancel = QPushButton("Annuler")
+        self.task_cancel.clicked.connect(self.tasks.cancel_all)
+        self.statusBar().addPermanentWidget(self.task_progress)
+        self.statusBar().addPermanentWidget(self.task_cancel)
+        self._set_task_widgets_visible(False)
+        self.tasks.task_started.connect(self._on_task_started)
+        self.tasks.task_progress.connect(self._on_task_progress)
+        self.tasks.task_ended.connect(self._on_task_ended)
+
+    def _migration_progress(self, version: int, rows_done: int) -> None:
+        LOGGER.info("Migration %s: %s lignes traitées", version, rows_done)
+        QApplication.processEvents()
+
+    def _set_task_widgets_visible(self, visible: bool) -> None:
+        self.task_progress.setVisible(visible)
+        self.task_cancel.setVisible(visible)
+
+    def _on_task_started(self, label: str) -> None:
+        self.task_progress.setRange(0, 0)
+        self._set_task_widgets_visible(True)
+        self.statusBar().showMessage(f"{label}…")
+
+    def _on_task_progress(self, label: str, done: int, total: int, message: str) -> None:
+        self.task_progress.setRange(0, total)
+        self.task_progress.setValue(min(done, total) if total else 0)
+        self.statusBar().showMessage(f"{label}: {message}" if message else f"{label}…")
+
+    def _on_task_ended(self, label: str) -> None:
+        if not self.tasks.busy:
+            self._set_task_widgets_visible(False)
+            self.statusBar().showMessage(f"{label} terminé", 5000)
+
     def change_page(self, index: int) -> None:
         self.stack.setCurrentIndex(index)
         if index == 0:
@@ -80,5 +127,16 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
         LOGGER.info("Fermeture application")
+        self.tasks.cancel_all()
+        self.tasks.wait()
+        stats = self.report_cache.stats()
+        LOGGER.info(
+            "Cache rapports: %s hits, %s misses (%.0f %%), %s évictions",
+            stats.hits,
+            stats.misses,
+            stats.hit_rate * 100,
+            stats.evictions,
+        )
+        self.db.optimize()
         self.db.close()
         super().closeEvent(event)
@@ -2,50 +2,65 @@
 from __future__ import annotations
 
 from PySide6.QtWidgets import (
+    QComboBox,
     QFileDialog,
     QFormLayout,
     QLabel,
     QLineEdit,
+    QMessageBox,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
+from app.db.database import PERFORMANCE_PROFILES
 from app.services.backups import BackupService
 from app.services.settings import SettingsService
+from app.ui.tasks import TaskRunner
 from app.utils.paths import BACKUP_DIR
 
 
 class SettingsView(QWidget):
     """Allow editing settings and managing backups."""
 
-    def __init__(self, settings: SettingsService, backups: BackupService) -> None:
+    def __init__(self, settings: SettingsService, backups: BackupService, tasks: TaskRunner) -> None:
         super().__init__()
         self.settings = settings
         self.backups = backups
+        self.tasks = tasks
 
         self.devise_edit = QLineEdit(self.settings.get_setting("devise"))
         self.regime_edit = QLineEdit(self.settings.get_setting("regime"))
         self.seuil_edit = QLineEdit(self.settings.get_setting("seuil_tva"))
         self.tolerance_edit = QLineEdit(self.settings.get_setting("tolerance_rapprochement"))
+        self.window_edit = QLineEdit(self.settings.get_setting("fenetre_rapprochement_jours"))
         self.backup_dir_edit = QLineEdit(self.settings.get_setting("dossier_backups", str(BACKUP_DIR)))
+        self.backup_mode_combo = QComboBox()
+        self.backup_mode_combo.addItems(["zip", "incrémental"])
+        self.backup_mode_combo.setCurrentText(self.settings.get_setting("mode_backup"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(list(PERFORMANCE_PROFILES))
+        self.profile_combo.setCurrentText(self.settings.get_setting("profil_performance"))
 
         choose_btn = QPushButton("Choisir…")
         choose_btn.clicked.connect(self.choose_backup_dir)
         save_btn = QPushButton("Enregistrer")
         save_btn.clicked.connect(self.save_settings)
-        backup_btn = QPushButton("Backup immédiat")
-        backup_btn.clicked.connect(self.create_backup)
+        self.backup_btn = QPushButton("Backup immédiat")
+        self.backup_btn.clicked.connect(self.create_backup)
 
         form = QFormLayout()
         form.addRow("Devise", self.devise_edit)
         form.addRow("Régime", self.regime_edit)
         form.addRow("Seuil TVA", self.seuil_edit)
         form.addRow("Tolérance rapprochement", self.tolerance_edit)
+        form.addRow("Fenêtre rapprochement (jours)", self.window_edit)
         form.addRow("Dossier backups", self.backup_dir_edit)
         form.addRow("", choose_btn)
+        form.addRow("Mode de backup", self.backup_mode_combo)
+        form.addRow("Profil SQLite", self.profile_combo)
         form.addRow(save_btn)
-        form.addRow(backup_btn)
+        form.addRow(self.backup_btn)
 
         layout = QVBoxLayout()
         layout.addWidget(QLabel("Paramètres"))
@@ -59,11 +74,31 @@ class SettingsView(QWidget):
             self.backup_dir_edit.setText(directory)
 
     def save_settings(self) -> None:
-        self.settings.set_setting("devise", self.devise_edit.text())
-        self.settings.set_setting("regime", self.regime_edit.text())
-        self.settings.set_setting("seuil_tva", self.seuil_edit.text())
-        self.settings.set_setting("tolerance_rapprochement", self.tolerance_edit.text())
-        self.settings.set_setting("dossier_backups", self.backup_dir_edit.text())
+        self.settings.import_settings(
+            {
+                "devise": self.devise_edit.text(),
+                "regime": self.regime_edit.text(),
+                "seuil_tva": self.seuil_edit.text(),
+                "tolerance_rapprochement": self.tolerance_edit.text(),
+                "fenetre_rapprochement_jours": self.window_edit.text(),
+                "dossier_backups": self.backup_dir_edit.text(),
+                "mode_backup": self.backup_mode_combo.currentText(),
+                "profil_performance": self.profile_combo.currentText(),
+            }
+        )
+        self.settings.apply_performance_profile()
 
     def create_backup(self) -> None:
-        self.backups.create_backup(BACKUP_DIR / "manuel.zip")
+        self.backup_btn.setEnabled(False)
+        self.tasks.submit(
+            "Sauvegarde",
+            lambda ctx: BackupService(ctx.db).backup_now(
+                progress=lambda done, total: ctx.progress(done, total, "copie de la base")
+            ),
+            on_done=lambda _: self.backup_btn.setEnabled(True),
+            on_error=self._backup_failed,
+        )
+
+    def _backup_failed(self, message: str) -> None:
+        self.backup_btn.setEnabled(True)
+        QMessageBox.warning(self, "Sauvegarde", f"La sauvegarde a échoué : {message}")
@@ -0,0 +1,169 @@
+"""Background execution of database work off the GUI thread."""
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from app.db.database import Database
+
+LOGGER = logging.getLogger(__name__)
+
+_TASK_KEYS = itertools.count(1)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when the user asked to cancel it."""
+
+
+class TaskContext:
+    """Handed to a task function; owns the worker thread's own connection."""
+
+    def __init__(self, key: int, db_path: Path, cancel_event: threading.Event, signals: "_TaskSignals") -> None:
+        self._key = key
+        self.db_path = db_path
+        self._cancel_event = cancel_event
+        self._signals = signals
+        self._db: Database | None = None
+
+    @property
+    def db(self) -> Database:
+        if self._db is None:
+            self._db = Database(self.db_path)
+        return self._db
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, done: int, total: int = 0, message: str = "") -> None:
+        """Report progress (``total=0`` means indeterminate) and honour cancellation."""
+        self._signals.progress.emit(self._key, done, total, message)
+        self.check_cancelled()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class _TaskSignals(QObject):
+    # Every signal carries the task key so the runner can route it.
+    progress = Signal(int, int, int, str)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    cancelled = Signal(int)
+
+
+class Task(QRunnable):
+    """Run ``fn(context)`` on a pool thread and report through Qt signals."""
+
+    def __init__(self, label: str, fn: Callable[[TaskContext], Any], db_path: Path) -> None:
+        super().__init__()
+        self.label = label
+        self.fn = fn
+        self.signals = _TaskSignals()
+        self._cancel_event = threading.Event()
+        self._db_path = db_path
+        self.key = next(_TASK_KEYS)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:
+        context = TaskContext(self.key, self._db_path, self._cancel_event, self.signals)
+        try:
+            context.check_cancelled()
+            result = self.fn(context)
+        except TaskCancelled:
+            LOGGER.info("Tâche annulée: %s", self.label)
+            context.close()
+            self.signals.cancelled.emit(self.key)
+        except Exception as exc:  # noqa: BLE001 - reported to the GUI
+            LOGGER.exception("Échec de la tâche %s", self.label)
+            context.close()
+            self.signals.failed.emit(self.key, str(exc))
+        else:
+            context.close()
+            self.signals.finished.emit(self.key, result)
+
+
+class TaskRunner(QObject):
+    """Submit tasks to a thread pool; callbacks always run on the GUI thread."""
+
+    task_started = Signal(str)
+    task_progress = Signal(str, int, int, str)
+    task_ended = Signal(str)
+
+    def __init__(self, db_path: Path, max_threads: int = 2) -> None:
+        super().__init__()
+        self.db_path = db_path
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._active: Dict[int, Task] = {}
+        self._callbacks: Dict[int, Tuple[Callable[[Any], None] | None, Callable[[str], None] | None]] = {}
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._active)
+
+    def submit(
+        self,
+        label: str,
+        fn: Callable[[TaskContext], Any],
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[str], None] | None = None,
+    ) -> Task:
+        task = Task(label, fn, self.db_path)
+        self._active[task.key] = task
+        self._callbacks[task.key] = (on_done, on_error)
+        task.signals.progress.connect(self._relay_progress)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.cancelled.connect(self._on_cancelled)
+        self.task_started.emit(label)
+        self.pool.start(task)
+        return task
+
+    def cancel_all(self) -> None:
+        for task in self._active.values():
+            task.cancel()
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _take(self, key: int) -> Tuple[Callable[[Any], None] | None, Callable[[str], None] | None]:
+        task = self._active.pop(key, None)
+        callbacks = self._callbacks.pop(key, (None, None))
+        if task is not None:
+            self.task_ended.emit(task.label)
+        return callbacks
+
+    def _relay_progress(self, key: int, done: int, total: int, message: str) -> None:
+        task = self._active.get(key)
+        if task is not None:
+            self.task_progress.emit(task.label, done, total, message)
+
+    def _on_finished(self, key: int, result: Any) -> None:
+        on_done, _ = self._take(key)
+        if on_done is not None:
+            on_done(result)
+
+    def _on_failed(self, key: int, message: str) -> None:
+        _, on_error = self._take(key)
+        if on_error is not None:
+            on_error(message)
+
+    def _on_cancelled(self, key: int) -> None:
+        self._take(key)
+
+
+__all__ = ["Task", "TaskCancelled", "TaskContext", "TaskRunner"]
@@ -0,0 +1,107 @@
+"""Lazily loaded table model for transactions."""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from app.models.entities import Transaction
+from app.services.transactions import TransactionService
+
+HEADERS = ["Date", "Libellé", "Montant", "Catégorie", "Paiement", "Tiers", "Note"]
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """Fetch transactions page by page as the view scrolls (keyset pagination)."""
+
+    def __init__(self, tx_service: TransactionService, page_size: int = 200) -> None:
+        super().__init__()
+        self.tx_service = tx_service
+        self.page_size = page_size
+        self.category_names: Dict[int, str] = {}
+        self.search_text = ""
+        self.search_limit = 500
+        self._rows: List[Transaction] = []
+        self._exhausted = False
+
+    def set_category_names(self, names: Dict[int, str]) -> None:
+        self.category_names = names
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 3), self.index(len(self._rows) - 1, 3))
+
+    def set_search(self, text: str) -> None:
+        """Switch to ranked search results, or back to paging when ``text`` is blank."""
+        self.search_text = text.strip()
+        self.reload()
+
+    def reload(self) -> None:
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def transaction_at(self, row: int) -> Transaction:
+        return self._rows[row]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        tx = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.TextAlignmentRole and column == 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        if column == 0:
+            return tx.date
+        if column == 1:
+            return tx.label
+        if column == 2:
+            return f"{tx.amount:.2f}"
+        if column == 3:
+            return self.category_names.get(tx.category_id, "")
+        if column == 4:
+            return tx.payment_method
+        if column == 5:
+            return ""
+        return tx.note
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+        if self.search_text:
+            self._exhausted = True
+            results = self.tx_service.search(self.search_text, limit=self.search_limit)
+            if results:
+                self.beginInsertRows(QModelIndex(), 0, len(results) - 1)
+                self._rows = results
+                self.endInsertRows()
+            return
+        after = (self._rows[-1].date, self._rows[-1].id) if self._rows else None
+        page = self.tx_service.list_transactions_page(after=after, limit=self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+
+__all__ = ["TransactionTableModel"]
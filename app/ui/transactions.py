@@ -3,8 +3,9 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
+from pathlib import Path
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
     QComboBox,
     QDateEdit,
@@ -14,10 +15,10 @@ from PySide6.QtWidgets import (
     QHeaderView,
     QLabel,
     QLineEdit,
+    QMessageBox,
     QPushButton,
     QSplitter,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTextEdit,
     QVBoxLayout,
     QWidget,
@@ -25,22 +26,35 @@ from PySide6.QtWidgets import (
 
 from app.models.entities import Transaction
 from app.services.categories import CategoryService
+from app.services.exporters import ExportService
 from app.services.transactions import TransactionService
+from app.ui.tasks import TaskRunner
+from app.ui.transaction_model import TransactionTableModel
 
 
 class TransactionsView(QWidget):
     """Allow listing and adding transactions."""
 
-    def __init__(self, tx_service: TransactionService, category_service: CategoryService) -> None:
+    def __init__(
+        self, tx_service: TransactionService, category_service: CategoryService, tasks: TaskRunner
+    ) -> None:
         super().__init__()
         self.tx_service = tx_service
         self.category_service = category_service
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
-            ["Date", "Libellé", "Montant", "Catégorie", "Paiement", "Tiers", "Note"]
-        )
+        self.tasks = tasks
+        self.model = TransactionTableModel(self.tx_service)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setDefaultSectionSize(22)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Rechercher (libellé, note, tiers)…")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
 
         self.date_edit = QDateEdit()
         self.date_edit.setCalendarPopup(True)
@@ -73,7 +87,13 @@ class TransactionsView(QWidget):
 
         splitter = QSplitter()
         table_container = QWidget()
+        self.export_btn = QPushButton("Exporter CSV…")
+        self.export_btn.clicked.connect(self.export_csv)
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.export_btn)
         table_layout = QVBoxLayout()
+        table_layout.addLayout(search_layout)
         table_layout.addWidget(self.table)
         table_container.setLayout(table_layout)
         splitter.addWidget(table_container)
@@ -93,23 +113,16 @@ class TransactionsView(QWidget):
 
     def load_categories(self) -> None:
         self.category_combo.clear()
-        for cat in self.category_service.list_categories():
+        categories = self.category_service.list_categories()
+        for cat in categories:
             self.category_combo.addItem(cat.name, cat.id)
+        self.model.set_category_names({cat.id: cat.name for cat in categories})
 
     def refresh(self) -> None:
-        transactions = self.tx_service.list_transactions()
-        self.table.setRowCount(len(transactions))
-        for row_idx, tx in enumerate(transactions):
-            self.table.setItem(row_idx, 0, QTableWidgetItem(tx.date))
-            self.table.setItem(row_idx, 1, QTableWidgetItem(tx.label))
-            self.table.setItem(row_idx, 2, QTableWidgetItem(f"{tx.amount:.2f}"))
-            category_name = self.category_combo.itemText(
-                self.category_combo.findData(tx.category_id)
-            )
-            self.table.setItem(row_idx, 3, QTableWidgetItem(category_name))
-            self.table.setItem(row_idx, 4, QTableWidgetItem(tx.payment_method))
-            self.table.setItem(row_idx, 5, QTableWidgetItem(""))
-            self.table.setItem(row_idx, 6, QTableWidgetItem(tx.note))
+        self.model.reload()
+
+    def apply_search(self) -> None:
+        self.model.set_search(self.search_edit.text())
 
     def save_transaction(self) -> None:
         amount = Decimal(self.amount_edit.text().replace(",", "."))
@@ -133,6 +146,23 @@ class TransactionsView(QWidget):
         self.note_edit.clear()
         self.attachment_edit.clear()
 
+    def export_csv(self) -> None:
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter les transactions", "transactions.csv", "CSV (*.csv)")
+        if not file_path:
+            return
+        target = Path(file_path)
+        self.export_btn.setEnabled(False)
+        self.tasks.submit(
+            "Export CSV",
+            lambda ctx: ExportService(ctx.db).export_all_transactions(target),
+            on_done=lambda _: self.export_btn.setEnabled(True),
+            on_error=self._export_failed,
+        )
+
+    def _export_failed(self, message: str) -> None:
+        self.export_btn.setEnabled(True)
+        QMessageBox.warning(self, "Export", f"L'export a échoué : {message}")
+
     def select_attachment(self) -> None:
         file_path, _ = QFileDialog.getOpenFileName(self, "Choisir un fichier")
         if file_path:
@@ -0,0 +1,27 @@
+"""Conversions between ``Decimal`` amounts and integer cents."""
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount: Decimal) -> int:
+    """Round ``amount`` to the cent (half up) and return it as an integer."""
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents: int | None) -> Decimal:
+    """Return a two-decimal ``Decimal`` for ``cents`` without going through ``float``."""
+    return Decimal(cents or 0).scaleb(-2)
+
+
+def format_cents(cents: int | None) -> str:
+    """Format cents as ``"-12.34"`` using integer arithmetic only."""
+    cents = cents or 0
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    return f"{sign}{units}.{rest:02d}"
+
+
+__all__ = ["CENT", "to_cents", "from_cents", "format_cents"]
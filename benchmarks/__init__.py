@@ -0,0 +1 @@
+"""Micro-benchmarks for the data layer (run with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,58 @@
+"""Compare per-statement commits with ``Database.batch`` for row-by-row writes."""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from app.db.database import Database, bootstrap
+from app.models.entities import Transaction
+from app.services.transactions import TransactionService
+
+
+def _transaction(i: int) -> Transaction:
+    return Transaction(
+        id=None,
+        date=f"2024-01-{i % 28 + 1:02d}",
+        label=f"Opération {i}",
+        amount=Decimal(i % 500) - Decimal("249.99"),
+        category_id=1,
+        counterparty_id=None,
+        payment_method="Carte",
+        note="",
+        attachment=None,
+    )
+
+
+def _run(db_path: Path, rows: int, batched: bool) -> float:
+    db = Database(db_path)
+    bootstrap(db)
+    service = TransactionService(db)
+    start = time.perf_counter()
+    if batched:
+        with db.batch():
+            for i in range(rows):
+                service.create_transaction(_transaction(i))
+    else:
+        for i in range(rows):
+            service.create_transaction(_transaction(i))
+    elapsed = time.perf_counter() - start
+    db.close()
+    return rows / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _run(Path(tmp) / "commit.db", args.rows, batched=False)
+        after = _run(Path(tmp) / "batch.db", args.rows, batched=True)
+    print(f"commit par ligne : {before:,.0f} lignes/s")
+    print(f"db.batch()       : {after:,.0f} lignes/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
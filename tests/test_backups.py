@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+from app.db.database import Database, bootstrap
+from app.models.entities import Transaction
+from app.services.incremental_backups import IncrementalBackupService
+from app.services.transactions import TransactionService
+
+
+def _fill(db: Database, count: int, label: str) -> None:
+    TransactionService(db).bulk_insert(
+        Transaction(id=None, date="2024-01-01", label=f"{label} {i}", amount=Decimal("1.00"), category_id=1,
+                    counterparty_id=None, payment_method="", note="x" * 200, attachment=None)
+        for i in range(count)
+    )
+
+
+def test_incremental_snapshots_share_chunks_and_restore(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    _fill(db, 2000, "avant")
+    store = IncrementalBackupService(db, tmp_path / "store", chunk_size=4096)
+    first = store.create_snapshot()
+    _fill(db, 20, "après")
+    second = store.create_snapshot()
+    assert store.last_stats.chunks_written < store.last_stats.chunks_total / 2
+    assert len({*first.chunks, *second.chunks}) < len(first.chunks) + len(second.chunks)
+    assert store.verify() == []
+
+    restored = tmp_path / "restored.db"
+    store.restore_snapshot(first.name, restored)
+    copy = Database(restored)
+    assert copy.query("SELECT COUNT(*) FROM transactions")[0][0] == 2000
+    copy.close()
+
+    assert store.prune(keep_last=1, keep_days=0) == [first.name]
+    assert store.verify() == []
+    victim = next((tmp_path / "store" / "chunks").glob("*/*"))
+    victim.write_bytes(b"corrompu")
+    assert store.verify()
+    db.close()
+
+
+def test_hot_copy_lets_writers_run_and_verifies(tmp_path: Path) -> None:
+    from app.db.database import check_integrity
+    from app.services.backups import BackupService
+
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    _fill(db, 3000, "base")
+    writer = Database(tmp_path / "test.db")
+    steps = []
+
+    def progress(done: int, total: int) -> None:
+        steps.append((done, total))
+        _fill(writer, 1, "pendant")
+
+    target = tmp_path / "copie.db"
+    db.backup_to(target, pages_per_step=20, pause=0, progress=progress)
+    assert len(steps) > 1 and steps[-1][0] == steps[-1][1]
+    assert check_integrity(target) == []
+    copy = Database(target)
+    assert copy.query("SELECT COUNT(*) FROM transactions")[0][0] >= 3000
+    copy.close()
+
+    BackupService(db).hot_copy(tmp_path / "verifiee.db")
+    assert check_integrity(tmp_path / "verifiee.db") == []
+    (tmp_path / "abime.db").write_bytes(b"SQLite format 3\x00" + b"\xff" * 4096)
+    assert check_integrity(tmp_path / "abime.db")
+    writer.close()
+    db.close()
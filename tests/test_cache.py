@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+from app.db.database import Database, bootstrap
+from app.models.entities import Transaction
+from app.services.cache import ResultCache
+from app.services.reports import ReportService
+from app.services.transactions import TransactionService
+
+
+def test_report_cache_invalidated_by_writes(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    cache = ResultCache(max_entries=2)
+    reports = ReportService(db, cache)
+    service = TransactionService(db)
+    tx = Transaction(id=None, date="2024-03-05", label="Vente", amount=Decimal("10.00"), category_id=1,
+                     counterparty_id=None, payment_method="", note="", attachment=None)
+
+    assert reports.totals_by_period("2024-03-01", "2024-03-31")["solde"] == Decimal("0.00")
+    reports.totals_by_period("2024-03-01", "2024-03-31")["solde"] = Decimal("99")
+    assert reports.totals_by_period("2024-03-01", "2024-03-31")["solde"] == Decimal("0.00")
+    assert (cache.stats().hits, cache.stats().misses) == (2, 1)
+
+    service.create_transaction(tx)
+    assert reports.totals_by_period("2024-03-01", "2024-03-31")["solde"] == Decimal("10.00")
+    assert cache.stats().misses == 2
+
+    other = Database(tmp_path / "test.db")
+    TransactionService(other).create_transaction(tx)
+    other.close()
+    assert reports.totals_by_period("2024-03-01", "2024-03-31")["solde"] == Decimal("20.00")
+
+    reports.monthly_balance("2024")
+    reports.totals_by_category("2024-03-01", "2024-03-31")
+    stats = cache.stats()
+    assert stats.size == 2 and stats.evictions == 1
+    db.close()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.db.database import Database, bootstrap
+
+
+def test_batch_commits_once_and_rolls_back_nested(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    with db.batch():
+        db.execute("INSERT INTO settings(key, value) VALUES('a', '1')")
+        with pytest.raises(RuntimeError):
+            with db.batch():
+                db.execute("INSERT INTO settings(key, value) VALUES('b', '2')")
+                raise RuntimeError("boom")
+        assert db.in_batch
+    assert not db.in_batch
+    other = Database(tmp_path / "test.db")
+    keys = {row[0] for row in other.query("SELECT key FROM settings")}
+    assert "a" in keys and "b" not in keys
+
+    with pytest.raises(RuntimeError):
+        with db.batch():
+            db.execute("INSERT INTO settings(key, value) VALUES('c', '3')")
+            raise RuntimeError("boom")
+    assert not other.query("SELECT 1 FROM settings WHERE key='c'")
+    other.close()
+    db.close()
+
+
+def test_performance_profile_from_settings(tmp_path: Path) -> None:
+    from app.services.settings import SettingsService
+
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    assert db.query("PRAGMA journal_mode")[0][0] == "wal"
+    settings = SettingsService(db)
+    settings.set_setting("profil_performance", "sécurité")
+    assert settings.apply_performance_profile() == "sécurité"
+    assert db.query("PRAGMA journal_mode")[0][0] == "delete"
+    assert db.query("PRAGMA synchronous")[0][0] == 2
+    db.close()
+
+
+def test_migration_v2_converts_amounts_to_cents(tmp_path: Path) -> None:
+    from decimal import Decimal
+
+    from app.db.database import SCHEMA_VERSION, get_schema_version
+    from app.db.migrations import _v1_initial_schema
+    from app.services.reports import ReportService
+    from app.services.transactions import TransactionService
+
+    db = Database(tmp_path / "v1.db")
+    db.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+    _v1_initial_schema(db)
+    db.execute("INSERT INTO settings(key, value) VALUES('schema_version', '1')")
+    db.executemany(
+        "INSERT INTO transactions(date, label, amount, category_id, payment_method, note) VALUES(?, ?, ?, 1, '', '')",
+        [("2024-01-02", "A", 0.1), ("2024-01-03", "B", 0.2), ("2024-01-04", "C", -10.05)],
+    )
+    bootstrap(db)
+    assert get_schema_version(db) == SCHEMA_VERSION
+    assert [row[0] for row in db.query("SELECT amount_cents FROM transactions ORDER BY id")] == [10, 20, -1005]
+    assert TransactionService(db).list_transactions()[0].amount == Decimal("-10.05")
+    totals = ReportService(db).totals_by_period("2024-01-01", "2024-01-31")
+    assert totals["recettes"] == Decimal("0.30")
+    assert totals["solde"] == Decimal("-9.75")
+    db.close()
+
+
+def test_generator_migration_commits_in_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.db import migrations
+
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    db.executemany(
+        "INSERT INTO transactions(date, label, amount_cents, payment_method, note) VALUES(?, '', 0, '', '')",
+        [(f"2024-01-{i % 28 + 1:02d}",) for i in range(25)],
+    )
+    db.execute("ALTER TABLE transactions ADD COLUMN month TEXT")
+
+    def backfill(db: Database):
+        return migrations.backfill_in_batches(db, "transactions", "month = substr(date, 1, 7)", "month IS NULL", 10)
+
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS", [*migrations.MIGRATIONS, migrations.Migration(99, "test", backfill)]
+    )
+    seen = []
+    bootstrap(db, progress=lambda version, done: seen.append((version, done)))
+    assert seen == [(99, 10), (99, 20), (99, 25)]
+    assert migrations.get_schema_version(db) == 99
+    assert not db.query("SELECT 1 FROM transactions WHERE month IS NULL")
+    assert bootstrap(db) is None and migrations.run_migrations(db) == []
+    db.close()
@@ -35,3 +35,34 @@ def test_import_invert_amount(tmp_path: Path) -> None:
     )
     transactions = service.parse(file_path, mapping)
     assert transactions[0].amount == Decimal("50")
+
+
+def test_import_file_in_chunks_and_resume(tmp_path: Path) -> None:
+    from app.db.database import Database, bootstrap
+    from app.services.import_csv import ImportInterrupted
+    from app.services.transactions import TransactionService
+
+    lines = ["date;libelle;montant"] + [f"2024-01-{i % 28 + 1:02d};Ligne {i};{i},50" for i in range(25)]
+    lines.insert(18, "2024-01-01;Cassée;abc")
+    file_path = tmp_path / "gros.csv"
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    service = CSVImportService()
+    mapping = CSVMapping(date_column="date", label_column="libelle", amount_column="montant", category_id=1)
+    progress = []
+
+    try:
+        service.import_file(file_path, mapping, TransactionService(db), chunk_size=5, progress=progress.append)
+    except ImportInterrupted as exc:
+        offset = exc.offset
+    assert offset == 15
+    assert [p.offset for p in progress] == [5, 10, 15]
+    assert db.query("SELECT COUNT(*) FROM transactions")[0][0] == 15
+
+    lines.pop(18)
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    end = service.import_file(file_path, mapping, TransactionService(db), chunk_size=5, start_offset=offset)
+    assert end == 25
+    assert db.query("SELECT COUNT(*) FROM transactions")[0][0] == 25
+    db.close()
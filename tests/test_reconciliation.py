@@ -15,3 +15,32 @@ def test_reconcile_matches_same_amount() -> None:
     ]
     matched = reconcile(transactions, Decimal("0.05"))
     assert 2 in matched or 1 in matched
+
+
+def _tx(tx_id: int, day: str, amount: str) -> Transaction:
+    return Transaction(id=tx_id, date=day, label="", amount=Decimal(amount), category_id=1,
+                       counterparty_id=None, payment_method="", note="", attachment=None)
+
+
+def test_match_statement_uses_date_window_and_splits() -> None:
+    from app.services.reconciliation import match_statement
+
+    book = [
+        _tx(1, "2024-03-01", "120.00"),
+        _tx(2, "2024-03-20", "120.00"),
+        _tx(3, "2024-03-10", "-30.00"),
+        _tx(4, "2024-03-11", "-45.10"),
+        _tx(5, "2024-06-01", "999.00"),
+    ]
+    bank = [
+        _tx(10, "2024-03-19", "119.80"),
+        _tx(11, "2024-03-12", "-75.00"),
+        _tx(12, "2024-03-02", "500.00"),
+    ]
+    result = match_statement(bank, book, Decimal("0.50"), date_window_days=3, max_parts=3)
+    pairs = {m.bank.id: sorted(tx.id for tx in m.book) for m in result.matches}
+    assert pairs == {10: [2], 11: [3, 4]}
+    assert [tx.id for tx in result.unmatched_bank] == [12]
+    assert sorted(tx.id for tx in result.unmatched_book) == [1, 5]
+    split = next(m for m in result.matches if m.bank.id == 11)
+    assert split.amount_diff == Decimal("-0.10") and split.day_diff == 2
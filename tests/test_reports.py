@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+from pathlib import Path
+
+from app.db.database import Database, bootstrap
+from app.models.entities import Transaction
+from app.services.reports import ReportService
+from app.services.transactions import TransactionService
+
+
+def _raw_totals(db: Database, start: str, end: str) -> dict:
+    row = db.query(
+        """
+        SELECT SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END),
+               SUM(CASE WHEN amount_cents < 0 THEN amount_cents ELSE 0 END)
+        FROM transactions WHERE date BETWEEN ? AND ?
+        """,
+        (start, end),
+    )[0]
+    return {"recettes": Decimal(row[0] or 0) / 100, "depenses": Decimal(row[1] or 0) / 100}
+
+
+def test_monthly_totals_follow_writes_and_match_raw_sums(tmp_path: Path) -> None:
+    rng = random.Random(7)
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    service = TransactionService(db)
+    reports = ReportService(db)
+    service.bulk_insert(
+        Transaction(id=None, date=f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", label="x",
+                    amount=Decimal(rng.randint(-50000, 50000)) / 100, category_id=rng.randint(1, 4),
+                    counterparty_id=None, payment_method="", note="", attachment=None)
+        for _ in range(300)
+    )
+    for tx in service.list_transactions(limit=20):
+        tx.amount = -tx.amount
+        tx.date = "2023-06-15"
+        service.update_transaction(tx)
+    for tx in service.list_transactions(limit=10, offset=50):
+        service.delete_transaction(tx.id)
+
+    assert reports.verify_monthly_totals() == []
+    for start, end in [("2023-01-01", "2023-12-31"), ("2023-02-10", "2023-07-03"), ("2023-06-02", "2023-06-20")]:
+        totals = reports.totals_by_period(start, end)
+        raw = _raw_totals(db, start, end)
+        assert totals["recettes"] == raw["recettes"]
+        assert totals["depenses"] == raw["depenses"]
+    by_month = dict(reports.monthly_balance("2023"))
+    raw = _raw_totals(db, "2023-06-01", "2023-06-30")
+    assert by_month["2023-06"] == raw["recettes"] + raw["depenses"]
+
+    db.execute("UPDATE monthly_totals SET tx_count = tx_count + 1 WHERE month = '2023-03'")
+    assert {month for month, _ in reports.verify_monthly_totals()} == {"2023-03"}
+    reports.rebuild_monthly_totals()
+    assert reports.verify_monthly_totals() == []
+    db.close()
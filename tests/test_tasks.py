@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from app.db.database import Database, bootstrap  # noqa: E402
+from app.ui.tasks import TaskRunner  # noqa: E402
+
+
+def _wait(app, runner: TaskRunner) -> None:
+    runner.wait()
+    while runner.busy:
+        app.processEvents()
+
+
+def test_task_runner_runs_off_thread_and_reports_back(tmp_path: Path) -> None:
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    bootstrap(db)
+    db.close()
+    runner = TaskRunner(db_path)
+    results, errors, progress = [], [], []
+    runner.task_progress.connect(lambda label, done, total, msg: progress.append(done))
+
+    def count(ctx):
+        ctx.progress(1, 2)
+        return ctx.db.query("SELECT COUNT(*) FROM categories")[0][0]
+
+    runner.submit("compte", count, on_done=results.append)
+    runner.submit("échec", lambda ctx: 1 / 0, on_error=errors.append)
+    _wait(app, runner)
+    assert results == [6]
+    assert errors and "division" in errors[0]
+    assert progress == [1]
+
+    release = threading.Event()
+
+    def slow(ctx):
+        release.wait(5)
+        ctx.progress(0)
+
+    task = runner.submit("annulée", slow, on_done=results.append)
+    task.cancel()
+    release.set()
+    _wait(app, runner)
+    assert results == [6]
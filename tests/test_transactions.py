@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+
+from app.db.database import Database, bootstrap
+from app.models.entities import Transaction
+from app.services.transactions import TransactionService
+
+
+def _tx(day: int, label: str) -> Transaction:
+    return Transaction(id=None, date=f"2024-01-{day:02d}", label=label, amount=Decimal("1.00"), category_id=1,
+                       counterparty_id=None, payment_method="", note="", attachment=None)
+
+
+def test_keyset_pages_cover_all_rows_in_order(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    service = TransactionService(db)
+    service.bulk_insert(_tx(i % 5 + 1, f"T{i}") for i in range(23))
+
+    seen = []
+    page = service.list_transactions_page(limit=10)
+    while page:
+        seen.extend(page)
+        last = page[-1]
+        page = service.list_transactions_page(after=(last.date, last.id), limit=10)
+
+    assert len(seen) == service.count_transactions() == 23
+    keys = [(tx.date, tx.id) for tx in seen]
+    assert keys == sorted(keys, reverse=True)
+    db.close()
+
+
+def test_search_ranks_label_matches_and_follows_updates(tmp_path: Path) -> None:
+    from app.services.counterparties import CounterpartyService
+    from app.services.transactions import TransactionFilters
+
+    db = Database(tmp_path / "test.db")
+    bootstrap(db)
+    service = TransactionService(db)
+    cp_id = CounterpartyService(db).upsert("Garage Dupont")
+    paid = _tx(3, "Réparation véhicule")
+    paid.counterparty_id = cp_id
+    first = service.create_transaction(paid)
+    other = _tx(4, "Loyer bureau")
+    other.note = "réparation porte"
+    second = service.create_transaction(other)
+
+    assert [tx.id for tx in service.search("repar")] == [first, second]
+    assert [tx.id for tx in service.search("dupont")] == [first]
+    assert [tx.id for tx in service.search("repar", TransactionFilters(start="2024-01-04"))] == [second]
+
+    db.execute("UPDATE counterparties SET name='Garage Martin' WHERE id=?", (cp_id,))
+    assert service.search("dupont") == []
+    service.delete_transaction(first)
+    assert [tx.id for tx in service.search("réparation")] == [second]
+    assert service.search("  ") == []
+    db.close()